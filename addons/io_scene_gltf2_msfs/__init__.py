@@ -58,6 +58,7 @@ from bpy.props import (StringProperty,
                        BoolProperty,
                        EnumProperty,
                        IntProperty,
+                       FloatProperty,
                        CollectionProperty)
 from bpy.types import Operator, AddonPreferences
 from bpy_extras.io_utils import ImportHelper, ExportHelper
@@ -160,6 +161,9 @@ class ExportGLTF2_Base:
                 ('JPEG', 'JPEG Format (.jpg)',
                 'Save images as JPEGs. (Images that need alpha are saved as PNGs though.) '
                 'Be aware of a possible loss in quality'),
+                ('DDS', 'DDS Format (.dds)',
+                'Save images as block compressed DDS textures with mipmaps, referenced with MSFT_texture_dds. '
+                'Normal maps use BC5, images with alpha BC3 and all others BC1'),
                ),
         description=(
             'Output format for images. PNG is lossless and generally preferred, but JPEG might be preferable for web '
@@ -168,6 +172,64 @@ class ExportGLTF2_Base:
         default='AUTO'
     )
 
+    export_image_cache: BoolProperty(
+        name='Cache Encoded Images',
+        description='Keep images that have to be encoded (e.g. packed metallic/roughness textures) in a cache, '
+                    'so that unchanged images are not encoded again by the next export',
+        default=True
+    )
+
+    export_image_cache_size: IntProperty(
+        name='Image Cache Size (MB)',
+        description='Maximum size of the image cache. The least recently used images are removed first',
+        default=2048,
+        min=0
+    )
+
+    export_png_compression: IntProperty(
+        name='PNG Compression',
+        description='Compression level of PNG images that have to be encoded. '
+                    'Higher levels give smaller files but take longer to export',
+        default=6,
+        min=0,
+        max=9
+    )
+
+    export_texture_max_size: IntProperty(
+        name='Max Texture Size',
+        description='Scale images down so that neither side is larger than this, e.g. for lower LODs. '
+                    'Materials can set a smaller limit. 0 is no limit',
+        default=0,
+        min=0
+    )
+
+    export_weld_position_tolerance: FloatProperty(
+        name='Weld Position Tolerance',
+        description='Merge vertices of unskinned meshes without shape keys that are closer than this, '
+                    'if all their other attributes match. 0 only merges vertices that are the same',
+        default=0.0,
+        min=0.0,
+        precision=5,
+        unit='LENGTH'
+    )
+
+    export_weld_normal_tolerance: FloatProperty(
+        name='Weld Normal Tolerance',
+        description='Merge vertex normals and tangents whose components differ by less than this. '
+                    '0 only merges exact matches',
+        default=0.0,
+        min=0.0,
+        precision=5
+    )
+
+    export_weld_uv_tolerance: FloatProperty(
+        name='Weld UV Tolerance',
+        description='Merge UVs whose components differ by less than this. 0 only merges exact matches',
+        default=0.0,
+        min=0.0,
+        precision=5
+    )
+
     export_texture_dir: StringProperty(
         name='Textures',
         description='Folder to place texture files in. Relative to the .gltf file',
@@ -507,12 +569,19 @@ class ExportGLTF2_Base:
 
         export_settings['gltf_format'] = self.export_format
         export_settings['gltf_image_format'] = self.export_image_format
+        export_settings['gltf_image_cache'] = self.export_image_cache
+        export_settings['gltf_image_cache_size'] = self.export_image_cache_size * 1024 * 1024
+        export_settings['gltf_png_compression'] = self.export_png_compression
+        export_settings['gltf_texture_max_size'] = self.export_texture_max_size
         export_settings['gltf_copyright'] = self.export_copyright
         export_settings['gltf_texcoords'] = self.export_texcoords
         export_settings['gltf_normals'] = self.export_normals
         export_settings['gltf_tangents'] = self.export_tangents and self.export_normals
         export_settings['gltf_loose_edges'] = self.use_mesh_edges
         export_settings['gltf_loose_points'] = self.use_mesh_vertices
+        export_settings['gltf_weld_position_tolerance'] = self.export_weld_position_tolerance
+        export_settings['gltf_weld_normal_tolerance'] = self.export_weld_normal_tolerance
+        export_settings['gltf_weld_uv_tolerance'] = self.export_weld_uv_tolerance
 
         if self.is_draco_available:
             export_settings['gltf_draco_mesh_compression'] = self.export_draco_mesh_compression_enable
@@ -575,7 +644,6 @@ class ExportGLTF2_Base:
         export_settings['gltf_lights'] = self.export_lights
         export_settings['gltf_displacement'] = self.export_displacement
 
-        export_settings['gltf_binary'] = bytearray()
         export_settings['gltf_binaryfilename'] = (
             os.path.splitext(os.path.basename(self.filepath))[0] + '.bin'
         )
@@ -734,10 +802,21 @@ class GLTFMSFS_PT_export_geometry(bpy.types.Panel):
         col.prop(operator, 'use_mesh_edges')
         col.prop(operator, 'use_mesh_vertices')
 
+        col = layout.column(align=True)
+        col.prop(operator, 'export_weld_position_tolerance', text="Weld Position")
+        col.prop(operator, 'export_weld_normal_tolerance', text="Normal")
+        col.prop(operator, 'export_weld_uv_tolerance', text="UV")
+
         layout.prop(operator, 'export_materials')
         col = layout.column()
         col.active = operator.export_materials == "EXPORT"
         col.prop(operator, 'export_image_format')
+        col.prop(operator, 'export_png_compression')
+        col.prop(operator, 'export_texture_max_size')
+        col.prop(operator, 'export_image_cache')
+        sub = col.column()
+        sub.active = operator.export_image_cache
+        sub.prop(operator, 'export_image_cache_size')
 
 
 class GLTFMSFS_PT_export_geometry_compression(bpy.types.Panel):
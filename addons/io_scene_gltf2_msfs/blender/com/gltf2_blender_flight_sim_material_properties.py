@@ -962,6 +962,7 @@ class msfs_material_properties(PropertyGroup):
     Material.msfs_wetness_ao_texture = PointerProperty(type = Image, name = "Wetness AO", update = functions.update_wetness_ao_texture) # this is anisotropic direction but the 3DS Max plugin has the variable name as wetness_ao
     Material.msfs_dirt_texture = PointerProperty(type = Image, name = "Dirt", update = functions.update_dirt_texture) # similar to wetness ao, this is clearcoat but the 3DS Max plugin has the variable name as dirt
     Material.msfs_height_map_texture = PointerProperty(type = Image, name = "Height Map") # Doesn't seem to be enabled yet in the 3DS Max plugin
+    Material.msfs_texture_max_size = IntProperty(name = "Max Texture Size", description = "Scale the textures of this material down on export so that neither side is larger than this. 0 is no limit", default = 0, min = 0)
 
     # Option visibility
     # Standard
@@ -216,6 +216,8 @@ class MATERIAL_PT_MSFSMaterials(Panel):
                         
                     #if mat.msfs_show_height_map_texture: Doesn't seem to be enabled yet in the 3DS Max Plugin
 
+                    box.prop(mat, "msfs_texture_max_size")
+
 classes = (
     MATERIAL_PT_MSFSMaterials,
 )
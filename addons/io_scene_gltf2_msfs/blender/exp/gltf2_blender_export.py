@@ -25,6 +25,8 @@ from io_scene_gltf2_msfs.io.com.gltf2_io_debug import print_console, print_newli
 from io_scene_gltf2_msfs.io.exp import gltf2_io_export
 from io_scene_gltf2_msfs.io.exp import gltf2_io_draco_compression_extension
 from io_scene_gltf2_msfs.io.exp import gltf2_io_asobo_buffer_views
+from io_scene_gltf2_msfs.io.exp import gltf2_io_asobo_bounding_box
+from io_scene_gltf2_msfs.io.exp.gltf2_io_image_cache import ImageCache
 from io_scene_gltf2_msfs.io.exp.gltf2_io_user_extensions import export_user_extensions
 
 
@@ -44,12 +46,12 @@ def save(context, export_settings):
     for callback in pre_export_callbacks:
         callback(export_settings)
 
-    json, buffer = __export(export_settings)
+    gltf, buffer = __export(export_settings)
 
     post_export_callbacks = export_settings["post_export_callbacks"]
     for callback in post_export_callbacks:
         callback(export_settings)
-    __write_file(json, buffer, export_settings)
+    __write_file(gltf, buffer, export_settings)
 
     end_time = time.time()
     __notify_end(context, end_time - start_time)
@@ -60,24 +62,26 @@ def save(context, export_settings):
 
 
 def __export(export_settings):
+    export_settings['image_cache'] = None
+    if export_settings['gltf_image_cache']:
+        export_settings['image_cache'] = ImageCache(
+            bpy.utils.user_resource('DATAFILES', path='gltf_msfs_image_cache', create=True),
+            export_settings['gltf_image_cache_size'])
+
     exporter = GlTF2Exporter(export_settings)
     __gather_gltf(exporter, export_settings)
     buffer = __create_buffer(exporter, export_settings)
     exporter.finalize_images()
-    json = __fix_json(exporter.glTF.to_dict())
+    exporter.report_statistics()
 
-    return json, buffer
+    if export_settings['image_cache'] is not None:
+        export_settings['image_cache'].evict()
+        export_settings['image_cache'].report_statistics()
 
+    return exporter.glTF, buffer
 
-def __gather_gltf(exporter, export_settings):
-    if export_settings['emulate_asobo_optimization']:
-        export_settings['bounding_box_max_x'] = 0
-        export_settings['bounding_box_max_y'] = 0
-        export_settings['bounding_box_max_z'] = 0
-        export_settings['bounding_box_min_x'] = 0
-        export_settings['bounding_box_min_y'] = 0
-        export_settings['bounding_box_min_z'] = 0
 
+def __gather_gltf(exporter, export_settings):
     active_scene_idx, scenes, animations = gltf2_blender_gather.gather_gltf2(export_settings)
 
     plan = {'active_scene_idx': active_scene_idx, 'scenes': scenes, 'animations': animations}
@@ -89,6 +93,9 @@ def __gather_gltf(exporter, export_settings):
         exporter.add_draco_extension()
 
     if export_settings['emulate_asobo_optimization']: # Prepare the primitives and buffer views for the simulator
+        bounding_box = gltf2_io_asobo_bounding_box.AsoboBoundingBox()
+        bounding_box.traverse_scenes(scenes)
+
         buffer_views = gltf2_io_asobo_buffer_views.AsoboBufferViews()
         buffer_views.traverse_scenes(scenes)
         exporter.add_asobo_buffer_views(buffer_views.BufferViews)
@@ -100,16 +107,7 @@ def __gather_gltf(exporter, export_settings):
 
     # Add asobo extensions
     if export_settings['emulate_asobo_optimization']:
-        bounding_box_max = [
-            export_settings['bounding_box_max_x'],
-            export_settings['bounding_box_max_y'],
-            export_settings['bounding_box_max_z'],
-        ]
-        bounding_box_min = [
-            export_settings['bounding_box_min_x'],
-            export_settings['bounding_box_min_y'],
-            export_settings['bounding_box_min_z'],
-        ]
+        bounding_box_min, bounding_box_max = bounding_box.to_lists()
 
         extensions = {
             "ASOBO_asset_optimized": {
@@ -127,7 +125,7 @@ def __gather_gltf(exporter, export_settings):
 
 
 def __create_buffer(exporter, export_settings):
-    buffer = bytes()
+    buffer = None
     if export_settings[gltf2_blender_export_keys.FORMAT] == 'GLB':
         buffer = exporter.finalize_buffer(export_settings[gltf2_blender_export_keys.FILE_DIRECTORY], is_glb=True)
     else:
@@ -140,48 +138,16 @@ def __create_buffer(exporter, export_settings):
     return buffer
 
 
-def __fix_json(obj):
-    # TODO: move to custom JSON encoder
-    fixed = obj
-    if isinstance(obj, dict):
-        fixed = {}
-        for key, value in obj.items():
-            if not __should_include_json_value(key, value):
-                continue
-            fixed[key] = __fix_json(value)
-    elif isinstance(obj, list):
-        fixed = []
-        for value in obj:
-            fixed.append(__fix_json(value))
-    elif isinstance(obj, float):
-        # force floats to int, if they are integers (prevent INTEGER_WRITTEN_AS_FLOAT validator warnings)
-        if int(obj) == obj:
-            return int(obj)
-    return fixed
-
-
-def __should_include_json_value(key, value):
-    allowed_empty_collections = ["KHR_materials_unlit"]
-
-    if value is None:
-        return False
-    elif __is_empty_collection(value) and key not in allowed_empty_collections:
-        return False
-    return True
-
-
-def __is_empty_collection(value):
-    return (isinstance(value, dict) or isinstance(value, list)) and len(value) == 0
-
-
-def __write_file(json, buffer, export_settings):
+def __write_file(gltf, buffer, export_settings):
     try:
         gltf2_io_export.save_gltf(
-            json,
+            gltf,
             export_settings,
             gltf2_blender_json.BlenderJSONEncoder,
             buffer)
-    except AssertionError as e:
+    except (AssertionError, TypeError, ValueError) as e:
+        # Values are only validated while the JSON is written: unsupported types raise TypeError and NaN or
+        # infinite floats raise ValueError.
         _, _, tb = sys.exc_info()
         traceback.print_tb(tb)  # Fixed format
         tb_info = traceback.extract_tb(tb)
@@ -51,7 +51,6 @@ CAMERAS = 'gltf_cameras'
 LIGHTS = 'gltf_lights'
 ANIMATIONS = 'gltf_animations'
 EMBED_IMAGES = 'gltf_embed_images'
-BINARY = 'gltf_binary'
 EMBED_BUFFERS = 'gltf_embed_buffers'
 USE_NO_COLOR = 'gltf_use_no_color'
 
@@ -12,12 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import bpy
 
 from io_scene_gltf2_msfs.io.com import gltf2_io
 from io_scene_gltf2_msfs.io.com.gltf2_io_debug import print_console
 from io_scene_gltf2_msfs.blender.exp import gltf2_blender_gather_nodes
 from io_scene_gltf2_msfs.blender.exp import gltf2_blender_gather_animations
+from io_scene_gltf2_msfs.blender.exp import gltf2_blender_gather_primitives
 from io_scene_gltf2_msfs.blender.exp.gltf2_blender_gather_cache import cached
 from ..com.gltf2_blender_extras import generate_extras
 from io_scene_gltf2_msfs.blender.exp import gltf2_blender_export_keys
@@ -33,12 +38,20 @@ def gather_gltf2(export_settings):
     scenes = []
     animations = []  # unfortunately animations in gltf2 are just as 'root' as scenes.
     active_scene = None
-    for blender_scene in bpy.data.scenes:
-        scenes.append(__gather_scene(blender_scene, export_settings))
-        if export_settings[gltf2_blender_export_keys.ANIMATIONS]:
-            animations += __gather_animations(blender_scene, export_settings)
-        if bpy.context.scene.name == blender_scene.name:
-            active_scene = len(scenes) -1
+    # Mesh data is read on the main thread, while the primitives are built on the executor
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        export_settings['primitive_executor'] = executor
+        export_settings['pending_primitives'] = deque()
+        try:
+            for blender_scene in bpy.data.scenes:
+                scenes.append(__gather_scene(blender_scene, export_settings))
+                if export_settings[gltf2_blender_export_keys.ANIMATIONS]:
+                    animations += __gather_animations(blender_scene, export_settings)
+                if bpy.context.scene.name == blender_scene.name:
+                    active_scene = len(scenes) -1
+            gltf2_blender_gather_primitives.finalize_primitives(export_settings)
+        finally:
+            export_settings['primitive_executor'] = None
     return active_scene, scenes, animations
 
 
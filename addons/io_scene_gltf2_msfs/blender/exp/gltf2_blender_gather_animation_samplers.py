@@ -17,6 +17,7 @@ import typing
 
 import bpy
 import mathutils
+import numpy as np
 from io_scene_gltf2_msfs.blender.com import gltf2_blender_math
 from io_scene_gltf2_msfs.blender.com.gltf2_blender_data_path import get_target_property_name, get_target_object_path
 from io_scene_gltf2_msfs.blender.exp import gltf2_blender_gather_animation_sampler_keyframes
@@ -242,14 +243,14 @@ def __gather_input(channels: typing.Tuple[bpy.types.FCurve],
                                                                                   action_name,
                                                                                   driver_obj,
                                                                                   export_settings)
-    times = [k.seconds for k in keyframes]
+    times = np.fromiter((k.seconds for k in keyframes), dtype=np.float64, count=len(keyframes))
 
     return gltf2_blender_gather_accessors.gather_accessor(
-        gltf2_io_binary_data.BinaryData.from_list(times, gltf2_io_constants.ComponentType.Float, emulate_asobo_optimization=export_settings['emulate_asobo_optimization']),
+        gltf2_io_binary_data.BinaryData.from_array(times, gltf2_io_constants.ComponentType.Float, emulate_asobo_optimization=export_settings['emulate_asobo_optimization']),
         gltf2_io_constants.ComponentType.Float,
         len(times),
-        tuple([max(times)]),
-        tuple([min(times)]),
+        tuple([float(times.max())]),
+        tuple([float(times.min())]),
         gltf2_io_constants.DataType.Scalar,
         export_settings
     )
@@ -394,6 +395,8 @@ def __gather_output(channels: typing.Tuple[bpy.types.FCurve],
 
         values += keyframe_value
 
+    values = np.array(values, dtype=np.float64)
+
     # store the keyframe data in a binary buffer
     component_type = gltf2_io_constants.ComponentType.Float
     if get_target_property_name(target_datapath) == "value":
@@ -403,7 +406,7 @@ def __gather_output(channels: typing.Tuple[bpy.types.FCurve],
         data_type = gltf2_io_constants.DataType.vec_type_from_num(len(keyframes[0].value))
 
     return gltf2_io.Accessor(
-        buffer_view=gltf2_io_binary_data.BinaryData.from_list(values, component_type, emulate_asobo_optimization=export_settings['emulate_asobo_optimization']),
+        buffer_view=gltf2_io_binary_data.BinaryData.from_array(values, component_type, emulate_asobo_optimization=export_settings['emulate_asobo_optimization']),
         byte_offset=None,
         component_type=component_type,
         count=len(values) // gltf2_io_constants.DataType.num_elements(data_type),
@@ -22,6 +22,7 @@ from io_scene_gltf2_msfs.blender.exp import gltf2_blender_search_node_tree
 from io_scene_gltf2_msfs.io.exp import gltf2_io_binary_data
 from io_scene_gltf2_msfs.io.exp import gltf2_io_image_data
 from io_scene_gltf2_msfs.io.com import gltf2_io_debug
+from io_scene_gltf2_msfs.io.exp import gltf2_io_dds
 from io_scene_gltf2_msfs.blender.exp.gltf2_blender_image import Channel, ExportImage, FillImage
 from io_scene_gltf2_msfs.blender.exp.gltf2_blender_gather_cache import cached
 from io_scene_gltf2_msfs.io.exp.gltf2_io_user_extensions import export_user_extensions
@@ -40,10 +41,12 @@ def gather_image(
         return None
 
     mime_type = __gather_mime_type(blender_shader_sockets, image_data, export_settings)
+    dds_compression = __gather_dds_compression(blender_shader_sockets, image_data, export_settings)
+    max_size = __gather_max_size(blender_shader_sockets, export_settings)
     name = __gather_name(image_data, export_settings)
 
-    uri = __gather_uri(image_data, mime_type, name, export_settings)
-    buffer_view = __gather_buffer_view(image_data, mime_type, name, export_settings)
+    uri = __gather_uri(image_data, mime_type, dds_compression, max_size, name, export_settings)
+    buffer_view = __gather_buffer_view(image_data, mime_type, dds_compression, max_size, name, export_settings)
 
     image = __make_image(
         buffer_view,
@@ -78,9 +81,15 @@ def __filter_image(sockets, export_settings):
 
 
 @cached
-def __gather_buffer_view(image_data, mime_type, name, export_settings):
+def __gather_buffer_view(image_data, mime_type, dds_compression, max_size, name, export_settings):
     if export_settings[gltf2_blender_export_keys.FORMAT] != 'GLTF_SEPARATE':
-        return gltf2_io_binary_data.BinaryData(data=image_data.encode(mime_type))
+        return gltf2_io_binary_data.BinaryData(data=image_data.encode(
+            mime_type,
+            export_settings['image_cache'],
+            export_settings['gltf_png_compression'],
+            dds_compression,
+            max_size
+        ))
     return None
 
 
@@ -93,6 +102,9 @@ def __gather_extras(sockets, export_settings):
 
 
 def __gather_mime_type(sockets, export_image, export_settings):
+    if export_settings["gltf_image_format"] == "DDS":
+        return "image/vnd-ms.dds"
+
     # force png if Alpha contained so we can export alpha
     for socket in sockets:
         if socket.name == "Alpha":
@@ -108,6 +120,30 @@ def __gather_mime_type(sockets, export_image, export_settings):
         return "image/jpeg"
 
 
+def __gather_dds_compression(sockets, export_image, export_settings):
+    if export_settings["gltf_image_format"] != "DDS":
+        return None
+
+    # normal maps only need X and Y, Z is reconstructed
+    for socket in sockets:
+        if socket.name in ("Normal", "Clearcoat Normal"):
+            return gltf2_io_dds.BC5
+
+    if export_image.is_filled(Channel.A):
+        return gltf2_io_dds.BC3
+    return gltf2_io_dds.BC1
+
+
+def __gather_max_size(sockets, export_settings):
+    # The smallest limit of the export and the materials using the sockets, 0 is no limit
+    limits = [export_settings['gltf_texture_max_size']]
+    node_trees = set(socket.id_data for socket in sockets)
+    for material in bpy.data.materials:
+        if material.node_tree is not None and material.node_tree in node_trees:
+            limits.append(material.msfs_texture_max_size)
+    return min((limit for limit in limits if limit > 0), default=0)
+
+
 def __gather_name(export_image, export_settings):
     # Find all Blender images used in the ExportImage
     imgs = []
@@ -136,11 +172,18 @@ def __gather_name(export_image, export_settings):
 
 
 @cached
-def __gather_uri(image_data, mime_type, name, export_settings):
+def __gather_uri(image_data, mime_type, dds_compression, max_size, name, export_settings):
     if export_settings[gltf2_blender_export_keys.FORMAT] == 'GLTF_SEPARATE':
         # as usual we just store the data in place instead of already resolving the references
+        # the encoding is finished when the image files are written, see GlTF2Exporter.finalize_images
         return gltf2_io_image_data.ImageData(
-            data=image_data.encode(mime_type=mime_type),
+            data=image_data.encode_deferred(
+                mime_type=mime_type,
+                cache=export_settings['image_cache'],
+                png_compression=export_settings['gltf_png_compression'],
+                dds_compression=dds_compression,
+                max_size=max_size
+            ),
             mime_type=mime_type,
             name=name
         )
@@ -54,12 +54,7 @@ def array_to_accessor(array, component_type, data_type, include_max_and_min=Fals
 
     num_elems = gltf2_io_constants.DataType.num_elements(data_type)
 
-    if type(array) is not np.ndarray:
-        array = np.array(array, dtype=dtype)
-        array = array.reshape(len(array) // num_elems, num_elems)
-
-    assert array.dtype == dtype
-    assert array.shape[1] == num_elems
+    array = np.asarray(array, dtype=dtype).reshape(-1, num_elems)
 
     amax = None
     amin = None
@@ -213,13 +208,18 @@ def __gather_colors(blender_primitive, export_settings): # TODO: I don't think t
     return attributes
 
 
+def __has_attribute(blender_primitive, attribute_id):
+    attribute = blender_primitive["attributes"].get(attribute_id)
+    return attribute is not None and len(attribute) > 0
+
+
 def __gather_skins(blender_primitive, export_settings):
     attributes = {}
     if export_settings[gltf2_blender_export_keys.SKINS]:
         bone_set_index = 0
         joint_id = 'JOINTS_' + str(bone_set_index)
         weight_id = 'WEIGHTS_' + str(bone_set_index)
-        while blender_primitive["attributes"].get(joint_id) and blender_primitive["attributes"].get(weight_id):
+        while __has_attribute(blender_primitive, joint_id) and __has_attribute(blender_primitive, weight_id):
             if bone_set_index >= 1:
                 if not export_settings['gltf_all_vertex_influences']:
                     gltf2_io_debug.print_console("WARNING", "There are more than 4 joint vertex influences."
@@ -229,7 +229,7 @@ def __gather_skins(blender_primitive, export_settings):
             # joints
             internal_joint = blender_primitive["attributes"][joint_id]
             component_type = gltf2_io_constants.ComponentType.UnsignedShort
-            if max(internal_joint) < 256:
+            if np.max(internal_joint) < 256:
                 component_type = gltf2_io_constants.ComponentType.UnsignedByte
             joint = array_to_accessor(
                 internal_joint,
@@ -249,12 +249,13 @@ def __gather_skins(blender_primitive, export_settings):
                 vertex_type = blender_primitive['VertexType']
 
             if not export_settings['gltf_all_vertex_influences'] and not vertex_type == 'BLEND1':
-                for idx in range(0, len(internal_weight), 4):
-                    weight_slice = internal_weight[idx:idx + 4]
-                    total = sum(weight_slice)
-                    if total > 0:
-                        factor = 1.0 / total
-                        internal_weight[idx:idx + 4] = [w * factor for w in weight_slice]
+                # Normalize in double precision, summing the weights in order
+                internal_weight = internal_weight.astype(np.float64)
+                total = internal_weight[:, 0] + internal_weight[:, 1]
+                total += internal_weight[:, 2]
+                total += internal_weight[:, 3]
+                positive = total > 0
+                internal_weight[positive] *= (1.0 / total[positive])[:, None]
 
             weight_component_type = gltf2_io_constants.ComponentType.Float
             weight_data_type = gltf2_io_constants.DataType.Vec4
@@ -263,7 +264,7 @@ def __gather_skins(blender_primitive, export_settings):
                     weight_data_type = gltf2_io_constants.DataType.Scalar # BLEND1 primitives use scalar instead of VEC4
                 else:
                     weight_component_type = gltf2_io_constants.ComponentType.UnsignedShort # BLEND4 primitives use unsigned shorts instead of floats
-                    internal_weight = [round(x * 65535) for x in internal_weight]
+                    internal_weight = np.rint(np.asarray(internal_weight, dtype=np.float64) * 65535)
 
             weight = array_to_accessor(
                 internal_weight,
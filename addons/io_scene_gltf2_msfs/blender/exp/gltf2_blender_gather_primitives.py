@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import bpy
+import os
 from typing import List, Optional, Tuple
 import numpy as np
 
@@ -76,10 +77,28 @@ def gather_primitives(
             mode=internal_primitive['mode'],
             targets=internal_primitive['targets']
         )
+        # Primitives that are still being extracted are filled in by finalize_primitives
+        internal_primitive['gltf_primitives'].append(primitive)
         primitives.append(primitive)
 
     return primitives
 
+
+def finalize_primitives(export_settings):
+    """
+    Wait for the meshes submitted to the primitive executor and fill in their primitives, in the order they were
+    gathered so that the output doesn't depend on which mesh finishes first.
+    """
+    pending = export_settings['pending_primitives']
+    while pending:
+        __fill_next_primitives(export_settings)
+
+
+def __fill_next_primitives(export_settings):
+    primitives, future = export_settings['pending_primitives'].popleft()
+    __fill_primitives(primitives, future.result(), export_settings)
+
+
 @cached
 def __gather_cache_primitives(
         blender_mesh: bpy.types.Mesh,
@@ -91,23 +110,46 @@ def __gather_cache_primitives(
 ) -> List[dict]:
     """
     Gather parts that are identical for instances, i.e. excluding materials
+
+    The mesh data is read right away, but when export_settings has a primitive executor the primitives are built on it
+    and only filled in by finalize_primitives, or earlier once too many meshes are in flight. Until then they have
+    their material, but no data.
     """
-    primitives = []
+    snapshot = gltf2_blender_extract.snapshot_mesh(
+        blender_mesh, library, blender_object, vertex_groups, modifiers, export_settings)
 
-    blender_primitives = gltf2_blender_extract.extract_primitives(
-        None, blender_mesh, library, blender_object, vertex_groups, modifiers, export_settings)
+    primitives = [{
+        "attributes": {},
+        "indices": None,
+        "mode": None,
+        "material": material_idx,
+        "targets": None,
+        "extras": None,
+        "gltf_primitives": [],
+    } for material_idx in gltf2_blender_extract.snapshot_primitive_materials(snapshot)]
 
-    for internal_primitive in blender_primitives:
+    executor = export_settings.get('primitive_executor')
+    if executor is None:
+        __fill_primitives(primitives, gltf2_blender_extract.build_primitives(snapshot, export_settings), export_settings)
+    else:
+        future = executor.submit(gltf2_blender_extract.build_primitives, snapshot, export_settings)
+        export_settings['pending_primitives'].append((primitives, future))
+        # Keep the snapshots and results in memory bounded, filling the oldest meshes keeps the output in order
+        while len(export_settings['pending_primitives']) > 2 * (os.cpu_count() or 1):
+            __fill_next_primitives(export_settings)
+
+    return primitives
+
+
+def __fill_primitives(primitives, blender_primitives, export_settings):
+    for primitive, internal_primitive in zip(primitives, blender_primitives):
+        primitive["attributes"] = __gather_attributes(internal_primitive, export_settings)
+        primitive["indices"] = __gather_indices(internal_primitive, export_settings)
+        primitive["mode"] = internal_primitive.get('mode')
+        primitive["targets"] = __gather_targets(internal_primitive, export_settings)
         if export_settings['emulate_asobo_optimization']:
-            primitive = {
-                "attributes": __gather_attributes(internal_primitive, blender_mesh, modifiers, export_settings),
-                "indices": __gather_indices(internal_primitive, blender_mesh, modifiers, export_settings),
-                "mode": internal_primitive.get('mode'),
-                "material": internal_primitive.get('material'),
-                "targets": __gather_targets(internal_primitive, blender_mesh, modifiers, export_settings),
-                "extras": {
-                    "ASOBO_primitive": {}
-                }
+            primitive["extras"] = {
+                "ASOBO_primitive": {}
             }
             # Set ASOBO_primitive data
             primitive["extras"]["ASOBO_primitive"]["BaseVertexIndex"] = internal_primitive.get("BaseVertexIndex")
@@ -115,19 +157,15 @@ def __gather_cache_primitives(
             primitive["extras"]["ASOBO_primitive"]["StartIndex"] = None
             primitive["extras"]["ASOBO_primitive"]["VertexType"] = internal_primitive.get("VertexType")
             primitive["extras"]["ASOBO_primitive"]["VertexVersion"] = 2
-        else:
-            primitive = {
-                "attributes": __gather_attributes(internal_primitive, blender_mesh, modifiers, export_settings),
-                "indices": __gather_indices(internal_primitive, blender_mesh, modifiers, export_settings),
-                "mode": internal_primitive.get('mode'),
-                "material": internal_primitive.get('material'),
-                "targets": __gather_targets(internal_primitive, blender_mesh, modifiers, export_settings)
-            }
-        primitives.append(primitive)
 
-    return primitives
+        for gltf_primitive in primitive["gltf_primitives"]:
+            gltf_primitive.attributes = primitive["attributes"]
+            gltf_primitive.extras = primitive["extras"]
+            gltf_primitive.indices = primitive["indices"]
+            gltf_primitive.mode = primitive["mode"]
+            gltf_primitive.targets = primitive["targets"]
 
-def __gather_indices(blender_primitive, blender_mesh, modifiers, export_settings):
+def __gather_indices(blender_primitive, export_settings):
     indices = blender_primitive.get('indices')
     if indices is None:
         return None
@@ -178,63 +216,55 @@ def __gather_indices(blender_primitive, blender_mesh, modifiers, export_settings
         )
 
 
-def __gather_attributes(blender_primitive, blender_mesh, modifiers, export_settings):
+def __gather_attributes(blender_primitive, export_settings):
     return gltf2_blender_gather_primitive_attributes.gather_primitive_attributes(blender_primitive, export_settings)
 
 
-def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings):
+def __gather_targets(blender_primitive, export_settings):
     if export_settings[MORPH] and not export_settings['emulate_asobo_optimization']: # MSFS doesn't support morph targets
         targets = []
-        if blender_mesh.shape_keys is not None:
-            morph_index = 0
-            for blender_shape_key in blender_mesh.shape_keys.key_blocks:
-                if blender_shape_key == blender_shape_key.relative_key:
-                    continue
-
-                if blender_shape_key.mute is True:
-                    continue
-
-                target_position_id = 'MORPH_POSITION_' + str(morph_index)
-                target_normal_id = 'MORPH_NORMAL_' + str(morph_index)
-                target_tangent_id = 'MORPH_TANGENT_' + str(morph_index)
-
-                if blender_primitive["attributes"].get(target_position_id) is not None:
-                    target = {}
-                    internal_target_position = blender_primitive["attributes"][target_position_id]
-                    target["POSITION"] = gltf2_blender_gather_primitive_attributes.array_to_accessor(
-                        internal_target_position,
-                        component_type=gltf2_io_constants.ComponentType.Float,
-                        data_type=gltf2_io_constants.DataType.Vec3,
-                        include_max_and_min=True,
-                        create_buffer_view=False if export_settings['emulate_asobo_optimization'] else True,
-                        emulate_asobo_optimization=export_settings['emulate_asobo_optimization'],
-                    )
-
-                    if export_settings[NORMALS] \
-                            and export_settings[MORPH_NORMAL] \
-                            and blender_primitive["attributes"].get(target_normal_id) is not None:
-
-                        internal_target_normal = blender_primitive["attributes"][target_normal_id]
-                        target['NORMAL'] = gltf2_blender_gather_primitive_attributes.array_to_accessor(
-                            internal_target_normal,
-                            component_type=gltf2_io_constants.ComponentType.Float,
-                            data_type=gltf2_io_constants.DataType.Vec3,
-                            create_buffer_view=False if export_settings['emulate_asobo_optimization'] else True,
-                            emulate_asobo_optimization=export_settings['emulate_asobo_optimization'],
-                        )
-
-                    if export_settings[TANGENTS] \
-                            and export_settings[MORPH_TANGENT] \
-                            and blender_primitive["attributes"].get(target_tangent_id) is not None:
-                        internal_target_tangent = blender_primitive["attributes"][target_tangent_id]
-                        target['TANGENT'] = gltf2_blender_gather_primitive_attributes.array_to_accessor(
-                            internal_target_tangent,
-                            component_type=gltf2_io_constants.ComponentType.Float,
-                            data_type=gltf2_io_constants.DataType.Vec3,
-                            create_buffer_view=False if export_settings['emulate_asobo_optimization'] else True,
-                            emulate_asobo_optimization=export_settings['emulate_asobo_optimization'],
-                        )
-                    targets.append(target)
-                    morph_index += 1
+        morph_index = 0
+        while blender_primitive["attributes"].get('MORPH_POSITION_' + str(morph_index)) is not None:
+            target_position_id = 'MORPH_POSITION_' + str(morph_index)
+            target_normal_id = 'MORPH_NORMAL_' + str(morph_index)
+            target_tangent_id = 'MORPH_TANGENT_' + str(morph_index)
+
+            target = {}
+            internal_target_position = blender_primitive["attributes"][target_position_id]
+            target["POSITION"] = gltf2_blender_gather_primitive_attributes.array_to_accessor(
+                internal_target_position,
+                component_type=gltf2_io_constants.ComponentType.Float,
+                data_type=gltf2_io_constants.DataType.Vec3,
+                include_max_and_min=True,
+                create_buffer_view=False if export_settings['emulate_asobo_optimization'] else True,
+                emulate_asobo_optimization=export_settings['emulate_asobo_optimization'],
+            )
+
+            if export_settings[NORMALS] \
+                    and export_settings[MORPH_NORMAL] \
+                    and blender_primitive["attributes"].get(target_normal_id) is not None:
+
+                internal_target_normal = blender_primitive["attributes"][target_normal_id]
+                target['NORMAL'] = gltf2_blender_gather_primitive_attributes.array_to_accessor(
+                    internal_target_normal,
+                    component_type=gltf2_io_constants.ComponentType.Float,
+                    data_type=gltf2_io_constants.DataType.Vec3,
+                    create_buffer_view=False if export_settings['emulate_asobo_optimization'] else True,
+                    emulate_asobo_optimization=export_settings['emulate_asobo_optimization'],
+                )
+
+            if export_settings[TANGENTS] \
+                    and export_settings[MORPH_TANGENT] \
+                    and blender_primitive["attributes"].get(target_tangent_id) is not None:
+                internal_target_tangent = blender_primitive["attributes"][target_tangent_id]
+                target['TANGENT'] = gltf2_blender_gather_primitive_attributes.array_to_accessor(
+                    internal_target_tangent,
+                    component_type=gltf2_io_constants.ComponentType.Float,
+                    data_type=gltf2_io_constants.DataType.Vec3,
+                    create_buffer_view=False if export_settings['emulate_asobo_optimization'] else True,
+                    emulate_asobo_optimization=export_settings['emulate_asobo_optimization'],
+                )
+            targets.append(target)
+            morph_index += 1
         return targets
     return None
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import mathutils
+import numpy as np
 from . import gltf2_blender_export_keys
 from io_scene_gltf2_msfs.blender.exp.gltf2_blender_gather_cache import cached
 from io_scene_gltf2_msfs.io.com import gltf2_io
@@ -105,18 +106,14 @@ def __gather_inverse_bind_matrices(blender_object, export_settings):
     for root_bone in root_bones:
         __collect_matrices(root_bone)
 
-    # flatten the matrices
-    inverse_matrices = []
-    for matrix in matrices:
-        for column in range(0, 4):
-            for row in range(0, 4):
-                inverse_matrices.append(matrix[row][column])
+    # flatten the matrices in column-major order
+    inverse_matrices = np.array(matrices, dtype=np.float32).reshape(-1, 4, 4).transpose(0, 2, 1)
 
-    binary_data = gltf2_io_binary_data.BinaryData.from_list(inverse_matrices, gltf2_io_constants.ComponentType.Float, emulate_asobo_optimization=export_settings['emulate_asobo_optimization'])
+    binary_data = gltf2_io_binary_data.BinaryData.from_array(inverse_matrices, gltf2_io_constants.ComponentType.Float, emulate_asobo_optimization=export_settings['emulate_asobo_optimization'])
     return gltf2_blender_gather_accessors.gather_accessor(
         binary_data,
         gltf2_io_constants.ComponentType.Float,
-        len(inverse_matrices) // gltf2_io_constants.DataType.num_elements(gltf2_io_constants.DataType.Mat4),
+        len(inverse_matrices),
         None,
         None,
         gltf2_io_constants.DataType.Mat4,
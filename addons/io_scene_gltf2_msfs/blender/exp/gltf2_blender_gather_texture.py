@@ -21,6 +21,7 @@ from io_scene_gltf2_msfs.blender.exp import gltf2_blender_gather_sampler
 from io_scene_gltf2_msfs.blender.exp import gltf2_blender_search_node_tree
 from io_scene_gltf2_msfs.blender.exp import gltf2_blender_gather_image
 from io_scene_gltf2_msfs.io.com import gltf2_io_debug
+from io_scene_gltf2_msfs.io.com.gltf2_io_extensions import Extension
 from io_scene_gltf2_msfs.io.exp.gltf2_io_user_extensions import export_user_extensions
 
 
@@ -38,18 +39,20 @@ def gather_texture(
     if not __filter_texture(blender_shader_sockets, export_settings):
         return None
 
+    source = __gather_source(blender_shader_sockets, export_settings)
+
+    # although valid, most viewers can't handle missing source properties
+    if source is None:
+        return None
+
     texture = gltf2_io.Texture(
-        extensions=__gather_extensions(blender_shader_sockets, export_settings),
+        extensions=__gather_extensions(source, export_settings),
         extras=__gather_extras(blender_shader_sockets, export_settings),
         name=__gather_name(blender_shader_sockets, export_settings),
         sampler=__gather_sampler(blender_shader_sockets, export_settings),
-        source=__gather_source(blender_shader_sockets, export_settings)
+        source=None if __is_dds(source) else source
     )
 
-    # although valid, most viewers can't handle missing source properties
-    if texture.source is None:
-        return None
-
     export_user_extensions('gather_texture_hook', export_settings, texture, blender_shader_sockets)
 
     return texture
@@ -59,7 +62,10 @@ def __filter_texture(blender_shader_sockets, export_settings):
     return True
 
 
-def __gather_extensions(blender_shader_sockets, export_settings):
+def __gather_extensions(source, export_settings):
+    if __is_dds(source):
+        # MSFS reads DDS images from the extension; there is no fallback image, so the extension is required
+        return {'MSFT_texture_dds': Extension('MSFT_texture_dds', {'source': source}, required=True)}
     return None
 
 
@@ -88,6 +94,10 @@ def __gather_source(blender_shader_sockets, export_settings):
 # Helpers
 
 
+def __is_dds(source):
+    return source.mime_type == "image/vnd-ms.dds"
+
+
 def __get_tex_from_socket(socket):
     result = gltf2_blender_search_node_tree.from_socket(
         socket,
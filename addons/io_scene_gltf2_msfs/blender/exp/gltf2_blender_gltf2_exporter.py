@@ -13,12 +13,17 @@
 # limitations under the License.
 import re
 import os
+import time
+import inspect
 import urllib.parse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from ... import get_version_string
 from io_scene_gltf2_msfs.io.com import gltf2_io
 from io_scene_gltf2_msfs.io.com import gltf2_io_extensions
+from io_scene_gltf2_msfs.io.com.gltf2_io_debug import print_console
 from io_scene_gltf2_msfs.io.exp import gltf2_io_binary_data
 from io_scene_gltf2_msfs.io.exp import gltf2_io_buffer
 from io_scene_gltf2_msfs.io.exp import gltf2_io_image_data
@@ -71,7 +76,16 @@ class GlTF2Exporter:
         )
 
         self.__buffer = gltf2_io_buffer.Buffer()
+        # images by file name, and the file name and URI of each image
         self.__images = {}
+        self.__image_names = {}
+        self.__image_uris = {}
+        self.__image_bytes_saved = 0
+        self.__image_duplicates = 0
+
+        # index of the objects already appended to each root level array, keyed by id of the array
+        self.__unique_indices = {}
+        self.__dedup_hits = Counter()
 
         # mapping of all glTFChildOfRootProperty types to their corresponding root level arrays
         self.__childOfRootPropertyTypeLookup = {
@@ -107,7 +121,24 @@ class GlTF2Exporter:
             gltf2_io.MaterialOcclusionTextureInfoClass
         ]
 
-        self.__traverse(asset)
+        # mapping of node types to the function that traverses them, types not in here are resolved on first use
+        self.__traverseHandlerLookup = {
+            list: self.__traverse_list,
+            dict: self.__traverse_dict,
+            type(None): self.__traverse_value,
+            bool: self.__traverse_value,
+            int: self.__traverse_value,
+            float: self.__traverse_value,
+            str: self.__traverse_value,
+        }
+        for property_type in self.__childOfRootPropertyTypeLookup:
+            self.__traverseHandlerLookup[property_type] = self.__traverse_child_of_root_property
+        for property_type in self.__propertyTypeLookup:
+            self.__traverseHandlerLookup[property_type] = self.__traverse_property
+
+        self.__traverse_time = 0.0
+
+        self.__traverse_root(asset)
 
     @property
     def glTF(self):
@@ -119,14 +150,15 @@ class GlTF2Exporter:
         for asobo_buffer_view in buffer_views:
             # Add the buffer view to the glTF buffer views
             self.__gltf.buffer_views.append(asobo_buffer_view)
-            binary_data = asobo_buffer_view.buffer.to_bytes()
-            offset = self.__buffer.add(binary_data)
+            # Hand the chunks over to the glTF buffer, the data is only materialized once the buffer is written
+            asobo_buffer = asobo_buffer_view.buffer
+            offset = self.__buffer.add_chunks(asobo_buffer.chunks)
             asobo_buffer_view.buffer = 0
-            asobo_buffer_view.byte_length = len(binary_data)
+            asobo_buffer_view.byte_length = asobo_buffer.byte_length
             asobo_buffer_view.byte_offset = offset
 
     def finalize_buffer(self, output_path=None, buffer_name=None, is_glb=False):
-        """Finalize the glTF and write buffers."""
+        """Finalize the glTF and write buffers. For GLB, return the buffer to be streamed into the BIN chunk."""
         if self.__finalized:
             raise RuntimeError("Tried to finalize buffers for finalized glTF file")
 
@@ -135,10 +167,11 @@ class GlTF2Exporter:
                 uri = None
             elif output_path and buffer_name:
                 with open(output_path + buffer_name, 'wb') as f:
-                    f.write(self.__buffer.to_bytes())
+                    self.__buffer.write_to(f)
                 uri = buffer_name
             else:
-                uri = self.__buffer.to_embed_string()
+                # streamed as base64 by the JSON writer
+                uri = self.__buffer.to_data_uri()
 
             buffer = gltf2_io.Buffer(
                 byte_length=self.__buffer.byte_length,
@@ -152,7 +185,7 @@ class GlTF2Exporter:
         self.__finalized = True
 
         if is_glb:
-            return self.__buffer.to_bytes()
+            return self.__buffer
 
     def add_draco_extension(self):
         """
@@ -166,17 +199,51 @@ class GlTF2Exporter:
     def finalize_images(self):
         """
         Write all images.
+
+        The Blender side of the encoding was done when the images were gathered. What is left (reading source
+        files, compressing, writing) doesn't touch Blender data and runs on a thread pool. Each image goes to its own
+        file, whose name was already chosen when the image was added, so the output does not depend on the order in
+        which the threads finish.
         """
         output_path = self.export_settings[gltf2_blender_export_keys.TEXTURE_DIRECTORY]
 
-        if self.__images:
-            os.makedirs(output_path, exist_ok=True)
+        if not self.__images:
+            return
+
+        os.makedirs(output_path, exist_ok=True)
+
+        def get_digest(name):
+            return self.__images[name].digest
 
-        for name, image in self.__images.items():
+        def write_image(name):
+            image = self.__images[name]
             dst_path = output_path + "/" + name + image.file_extension
             with open(dst_path, 'wb') as f:
                 f.write(image.data)
 
+        start_time = time.time()
+        with ThreadPoolExecutor() as executor:
+            # Images are content addressed: equal images (e.g. the same texture loaded twice) are written once,
+            # under the name of the first one. Hashing finishes the encoding, so it runs on the pool too.
+            names = list(self.__images.keys())
+            unique_names = {}
+            replaced_uris = {}
+            for name, digest in zip(names, executor.map(get_digest, names)):
+                unique_name = unique_names.setdefault(digest, name)
+                if unique_name != name:
+                    replaced_uris[self.__image_uris[name]] = self.__image_uris[unique_name]
+                    self.__image_bytes_saved += self.__images[name].byte_length
+                    self.__image_duplicates += 1
+
+            # consume the results so that exceptions of the workers are raised here
+            list(executor.map(write_image, unique_names.values()))
+
+        for image in self.__gltf.images:
+            if image.uri in replaced_uris:
+                image.uri = replaced_uris[image.uri]
+
+        print_console('PROFILE', 'Delta time: {} ({} images written)'.format(time.time() - start_time, len(unique_names)))
+
     def add_scene(self, scene: gltf2_io.Scene, active: bool = False):
         """
         Add a scene to the glTF.
@@ -191,7 +258,7 @@ class GlTF2Exporter:
 
         # for node in scene.nodes:
         #     self.__traverse(node)
-        scene_num = self.__traverse(scene)
+        scene_num = self.__traverse_root(scene)
         if active:
             self.__gltf.scene = scene_num
 
@@ -205,7 +272,7 @@ class GlTF2Exporter:
         if self.__finalized:
             raise RuntimeError("Tried to add animation to finalized glTF file")
 
-        self.__traverse(animation)
+        self.__traverse_root(animation)
 
     def add_asobo_asset_extensions(self, extensions):
         """
@@ -246,16 +313,32 @@ class GlTF2Exporter:
         if extension not in self.__gltf.extensions_used:
             self.__gltf.extensions_used.append(extension)
 
-    @staticmethod
-    def __append_unique_and_get_index(target: list, obj):
-        if obj in target:
-            return target.index(obj)
-        else:
-            index = len(target)
-            target.append(obj)
+    def __append_unique_and_get_index(self, target: list, obj):
+        unique_index = self.__unique_indices.get(id(target))
+        if unique_index is None:
+            unique_index = _UniqueIndex(target)
+            self.__unique_indices[id(target)] = unique_index
+
+        index = unique_index.find(obj)
+        if index is not None:
+            self.__dedup_hits[type(obj).__name__] += 1
             return index
+        return unique_index.append(obj)
+
+    def report_statistics(self):
+        """Print the time spent traversing and how many objects were found in the glTF root arrays, per type."""
+        print_console('PROFILE', 'Delta time: {} (glTF traversal)'.format(self.__traverse_time))
+        for type_name, hits in sorted(self.__dedup_hits.items()):
+            print_console('DEBUG', 'Deduplicated {} {} references'.format(hits, type_name))
+        if self.__image_duplicates:
+            print_console('INFO', 'Deduplicated {} images, {:.1f} MB saved'.format(
+                self.__image_duplicates, self.__image_bytes_saved / (1024 * 1024)))
 
     def __add_image(self, image: gltf2_io_image_data.ImageData):
+        name = self.__image_names.get(image)
+        if name is not None:
+            return self.__image_uris[name]
+
         name = image.adjusted_name()
         count = 1
         regex = re.compile(r"-\d+$")
@@ -270,6 +353,7 @@ class GlTF2Exporter:
         # TODO: allow embedding of images (base64)
 
         self.__images[name] = image
+        self.__image_names[image] = name
 
         texture_dir = self.export_settings[gltf2_blender_export_keys.TEXTURE_DIRECTORY]
         abs_path = os.path.join(texture_dir, name + image.file_extension)
@@ -277,7 +361,9 @@ class GlTF2Exporter:
             abs_path,
             start=self.export_settings[gltf2_blender_export_keys.FILE_DIRECTORY],
         )
-        return _path_to_uri(rel_path)
+        uri = _path_to_uri(rel_path)
+        self.__image_uris[name] = uri
+        return uri
 
     @classmethod
     def __get_key_path(cls, d: dict, keypath: List[str], default):
@@ -293,6 +379,12 @@ class GlTF2Exporter:
         d[key] = d_key
         return cls.__get_key_path(d[key], keypath, default)
 
+    def __traverse_root(self, node):
+        start = time.perf_counter()
+        result = self.__traverse(node)
+        self.__traverse_time += time.perf_counter() - start
+        return result
+
     def __traverse(self, node):
         """
         Recursively traverse a scene graph consisting of gltf compatible elements.
@@ -300,69 +392,169 @@ class GlTF2Exporter:
         The tree is traversed downwards until a primitive is reached. Then any ChildOfRoot property
         is stored in the according list in the glTF and replaced with a index reference in the upper level.
         """
-        def __traverse_property(node):
-            for member_name in [a for a in dir(node) if not a.startswith('__') and not callable(getattr(node, a))]:
-                new_value = self.__traverse(getattr(node, member_name))
-                setattr(node, member_name, new_value)  # usually this is the same as before
-
-                # # TODO: maybe with extensions hooks we can find a more elegant solution
-                # if member_name == "extensions" and new_value is not None:
-                #     for extension_name in new_value.keys():
-                #         self.__append_unique_and_get_index(self.__gltf.extensions_used, extension_name)
-                #         self.__append_unique_and_get_index(self.__gltf.extensions_required, extension_name)
-            return node
+        handler = self.__traverseHandlerLookup.get(type(node))
+        if handler is None:
+            handler = self.__get_traverse_handler(type(node))
+        return handler(node)
+
+    def __get_traverse_handler(self, node_type):
+        """Find the traverse function of a type that is not in the lookup yet and add it."""
+        if issubclass(node_type, list):
+            handler = self.__traverse_list
+        elif issubclass(node_type, dict):
+            handler = self.__traverse_dict
+        elif issubclass(node_type, gltf2_io_binary_data.BinaryData):
+            handler = self.__traverse_binary_data
+        elif issubclass(node_type, gltf2_io_image_data.ImageData):
+            handler = self.__traverse_image_data
+        elif issubclass(node_type, gltf2_io_extensions.Extension):
+            handler = self.__traverse_extension
+        else:
+            # do nothing for any type that does not match a glTF schema (primitives)
+            handler = self.__traverse_value
+
+        self.__traverseHandlerLookup[node_type] = handler
+        return handler
+
+    def __traverse_property(self, node):
+        for member_name in _get_property_fields(type(node)):
+            value = getattr(node, member_name)
+            if value is None:
+                continue
+
+            handler = self.__traverseHandlerLookup.get(type(value))
+            if handler is None:
+                handler = self.__get_traverse_handler(type(value))
+            if handler == self.__traverse_value:
+                continue
 
+            setattr(node, member_name, handler(value))  # usually this is the same as before
+        return node
+
+    def __traverse_child_of_root_property(self, node):
         # traverse nodes of a child of root property type and add them to the glTF root
-        if type(node) in self.__childOfRootPropertyTypeLookup:
-            node = __traverse_property(node)
-            idx = self.__to_reference(node)
-            # child of root properties are only present at root level --> replace with index in upper level
-            return idx
+        node = self.__traverse_property(node)
+        idx = self.__to_reference(node)
+        # child of root properties are only present at root level --> replace with index in upper level
+        return idx
 
+    def __traverse_list(self, node):
         # traverse lists, such as children and replace them with indices
-        if isinstance(node, list):
-            for i in range(len(node)):
-                node[i] = self.__traverse(node[i])
-            return node
-
-        if isinstance(node, dict):
-            for key in node.keys():
-                node[key] = self.__traverse(node[key])
-            return node
+        for i in range(len(node)):
+            node[i] = self.__traverse(node[i])
+        return node
 
-        # traverse into any other property
-        if type(node) in self.__propertyTypeLookup:
-            return __traverse_property(node)
+    def __traverse_dict(self, node):
+        for key in node.keys():
+            node[key] = self.__traverse(node[key])
+        return node
 
+    def __traverse_binary_data(self, node):
         # binary data needs to be moved to a buffer and referenced with a buffer view
-        if isinstance(node, gltf2_io_binary_data.BinaryData):
-            buffer_view = self.__buffer.add_and_get_view(node)
-            return self.__to_reference(buffer_view)
+        buffer_view = self.__buffer.add_and_get_view(node)
+        return self.__to_reference(buffer_view)
 
+    def __traverse_image_data(self, node):
         # image data needs to be saved to file
-        if isinstance(node, gltf2_io_image_data.ImageData):
-            image = self.__add_image(node)
-            return image
-
-        # extensions
-        if isinstance(node, gltf2_io_extensions.Extension):
-            extension = self.__traverse(node.extension)
-            self.__append_unique_and_get_index(self.__gltf.extensions_used, node.name)
-            if node.required:
-                self.__append_unique_and_get_index(self.__gltf.extensions_required, node.name)
-
-            # extensions that lie in the root of the glTF.
-            # They need to be converted to a reference at place of occurrence
-            if isinstance(node, gltf2_io_extensions.ChildOfRootExtension):
-                root_extension_list = self.__get_key_path(self.__gltf.extensions, [node.name] + node.path, [])
-                idx = self.__append_unique_and_get_index(root_extension_list, extension)
-                return idx
-
-            return extension
-
-        # do nothing for any type that does not match a glTF schema (primitives)
+        image = self.__add_image(node)
+        return image
+
+    def __traverse_extension(self, node):
+        extension = self.__traverse(node.extension)
+        self.__append_unique_and_get_index(self.__gltf.extensions_used, node.name)
+        if node.required:
+            self.__append_unique_and_get_index(self.__gltf.extensions_required, node.name)
+
+        # extensions that lie in the root of the glTF.
+        # They need to be converted to a reference at place of occurrence
+        if isinstance(node, gltf2_io_extensions.ChildOfRootExtension):
+            root_extension_list = self.__get_key_path(self.__gltf.extensions, [node.name] + node.path, [])
+            idx = self.__append_unique_and_get_index(root_extension_list, extension)
+            return idx
+
+        return extension
+
+    @staticmethod
+    def __traverse_value(node):
         return node
 
+
+# field names of each glTF property class, in the order they are traversed
+_property_fields = {}
+
+
+def _get_property_fields(property_type):
+    """
+    Get the field names of a glTF property class from its constructor arguments.
+
+    The declared slots are not used, since they also contain attributes that are only set by the importer.
+    """
+    fields = _property_fields.get(property_type)
+    if fields is None:
+        fields = tuple(sorted(name for name in inspect.signature(property_type.__init__).parameters if name != 'self'))
+        _property_fields[property_type] = fields
+    return fields
+
+
+class _UniqueIndex:
+    """
+    Index of the objects in a glTF root array, used to append each object only once.
+
+    Objects are looked up by identity. Hashable objects that compare by value (such as extension names) are
+    also looked up by value, other objects that compare by value fall back to a scan of the array.
+    Objects appended to the array from outside are indexed on the next lookup.
+    """
+
+    def __init__(self, target: list):
+        self.__target = target
+        self.__by_id = {}
+        self.__by_value = {}
+        self.__indexed = 0
+
+    @staticmethod
+    def __compares_by_value(obj):
+        return type(obj).__eq__ is not object.__eq__
+
+    @staticmethod
+    def __is_hashable(obj):
+        return type(obj).__hash__ is not None
+
+    def __index(self, obj, index):
+        self.__by_id.setdefault(id(obj), index)
+        if self.__compares_by_value(obj) and self.__is_hashable(obj):
+            self.__by_value.setdefault(obj, index)
+
+    def __update(self):
+        for index in range(self.__indexed, len(self.__target)):
+            self.__index(self.__target[index], index)
+        self.__indexed = len(self.__target)
+
+    def find(self, obj):
+        """Return the index of the object (or an equal one) in the array, or None."""
+        self.__update()
+
+        index = self.__by_id.get(id(obj))
+        if index is not None:
+            return index
+
+        if self.__compares_by_value(obj):
+            if self.__is_hashable(obj):
+                return self.__by_value.get(obj)
+            if obj in self.__target:
+                return self.__target.index(obj)
+
+        return None
+
+    def append(self, obj):
+        """Append the object to the array and return its index."""
+        self.__update()
+        index = len(self.__target)
+        self.__target.append(obj)
+        self.__index(obj, index)
+        self.__indexed = len(self.__target)
+        return index
+
+
 def _path_to_uri(path):
     path = os.path.normpath(path)
     path = path.replace(os.sep, '/')
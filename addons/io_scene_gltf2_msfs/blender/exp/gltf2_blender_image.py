@@ -14,11 +14,17 @@
 
 import bpy
 import os
-from typing import Optional, Tuple
+from typing import Callable, List, Optional
 import numpy as np
+import hashlib
 import tempfile
 import enum
 
+from io_scene_gltf2_msfs.io.exp.gltf2_io_image_cache import ImageCache
+from io_scene_gltf2_msfs.io.exp.gltf2_io_png import encode_png
+from io_scene_gltf2_msfs.io.exp.gltf2_io_dds import BC5, encode_dds
+from io_scene_gltf2_msfs.io.exp.gltf2_io_image_resample import fit_size, resize
+
 
 class Channel(enum.IntEnum):
     R = 0
@@ -61,11 +67,29 @@ class ExportImage:
     packs those into the B and G channels for glTF.
 
     Storing this description (instead of raw pixels) lets us make more
-    intelligent decisions about how to encode the image.
+    intelligent decisions about how to encode the image. ExportImages with
+    the same description compare equal, so that an image used by several
+    materials is only encoded once.
     """
 
     def __init__(self):
         self.fills = {}
+        self.png_compression = 6
+        self.dds_compression = None
+        self.max_size = 0
+
+    def __eq__(self, other):
+        return isinstance(other, ExportImage) and self.__description() == other.__description()
+
+    def __hash__(self):
+        return hash(self.__description())
+
+    def __description(self):
+        # images by name, Blender can hand out different Python objects for the same image
+        return tuple(sorted(
+            (int(dst_chan), (fill.image.name, int(fill.src_chan)) if isinstance(fill, FillImage) else None)
+            for dst_chan, fill in self.fills.items()
+        ))
 
     @staticmethod
     def from_blender_image(image: bpy.types.Image):
@@ -104,99 +128,185 @@ class ExportImage:
             len(set(fill.image.name for fill in self.fills.values())) == 1
         )
 
-    def encode(self, mime_type: Optional[str]) -> bytes:
+    def encode(self, mime_type: Optional[str], cache: Optional[ImageCache] = None, png_compression: int = 6,
+               dds_compression: Optional[str] = None, max_size: int = 0) -> bytes:
+        return self.encode_deferred(mime_type, cache, png_compression, dds_compression, max_size)()
+
+    def encode_deferred(self, mime_type: Optional[str], cache: Optional[ImageCache] = None,
+                        png_compression: int = 6, dds_compression: Optional[str] = None,
+                        max_size: int = 0) -> Callable[[], bytes]:
+        """
+        Do the part of the encoding that needs Blender and return a function that finishes it.
+
+        Blender data can only be accessed from the main thread. The returned function does not touch it, so it can
+        be run later on a worker thread. Images that have to be encoded are looked up in the cache first, if given.
+        DDS images are block compressed with dds_compression (BC1, BC3 or BC5). Images larger than max_size are
+        scaled down to fit it, 0 is no limit.
+        """
         self.file_format = {
             "image/jpeg": "JPEG",
-            "image/png": "PNG"
+            "image/png": "PNG",
+            "image/vnd-ms.dds": "DDS"
         }.get(mime_type, "PNG")
+        self.png_compression = png_compression
+        self.dds_compression = dds_compression
+        self.max_size = max_size
 
         # Happy path = we can just use an existing Blender image
-        if self.__on_happy_path():
-            return self.__encode_happy()
-
-        # Unhappy path = we need to create the image self.fills describes.
-        return self.__encode_unhappy()
-
-    def __encode_happy(self) -> bytes:
-        return self.__encode_from_image(self.blender_image())
-
-    def __encode_unhappy(self) -> bytes:
-        # We need to assemble the image out of channels.
-        # Do it with numpy and image.pixels.
-
-        # Find all Blender images used
+        if self.__can_use_blender_image():
+            encode = self.__reuse_image_file(self.blender_image())
+            if encode is not None:
+                return encode
+
+        key = None
+        if cache is not None:
+            key = self.__cache_key(cache)
+            if cache.contains(key):
+                return lambda: cache.read(key)
+
+        if self.__can_use_blender_image():
+            data = self.__encode_from_image(self.blender_image())
+            encode = lambda: data
+        else:
+            # Unhappy path = we need to create the image self.fills describes.
+            encode = self.__encode_unhappy()
+
+        if key is not None:
+            return lambda: cache.store(key, encode())
+        return encode
+
+    def __can_use_blender_image(self) -> bool:
+        # DDS images and images over the size limit are always created from the pixels, Blender can't write them
+        if not self.__on_happy_path() or self.file_format == 'DDS':
+            return False
+        width, height = self.blender_image().size
+        return fit_size(width, height, self.max_size) == (width, height)
+
+    def __blender_images(self) -> List[bpy.types.Image]:
+        """All Blender images used, in fill order."""
         images = []
         for fill in self.fills.values():
             if isinstance(fill, FillImage):
                 if fill.image not in images:
                     images.append(fill.image)
+        return images
+
+    def __cache_key(self, cache: ImageCache) -> str:
+        # Everything the encoded bytes depend on: the source images, how they fill the channels and the format
+        images = self.__blender_images()
+        parts = [
+            self.file_format,
+            'png_compression={}'.format(self.png_compression),
+            'dds_compression={}'.format(self.dds_compression),
+            'max_size={}'.format(self.max_size),
+        ]
+        for image in images:
+            parts.append(_image_content_hash(image, cache))
+            parts.append('{}x{} {} {}'.format(
+                image.size[0], image.size[1], image.colorspace_settings.name, image.alpha_mode))
+        for dst_chan, fill in sorted(self.fills.items()):
+            if isinstance(fill, FillImage):
+                parts.append('{}={}.{}'.format(int(dst_chan), images.index(fill.image), int(fill.src_chan)))
+            else:
+                parts.append('{}=white'.format(int(dst_chan)))
+        return cache.make_key(*parts)
+
+    def __encode_unhappy(self) -> Callable[[], bytes]:
+        # We need to assemble the image out of channels.
+        # Do it with numpy and image.pixels.
+
+        # Find all Blender images used
+        images = self.__blender_images()
 
         if not images:
             # No ImageFills; use a 1x1 white pixel
-            pixels = np.array([1.0, 1.0, 1.0, 1.0])
-            return self.__encode_from_numpy_array(pixels, (1, 1))
+            pixels = np.full((1, 1, 4), 255, np.uint8)
+            return self.__encode_from_numpy_array(pixels)
 
         width = max(image.size[0] for image in images)
         height = max(image.size[1] for image in images)
+        width, height = fit_size(width, height, self.max_size)
 
-        out_buf = np.ones(width * height * 4, np.float32)
-        tmp_buf = np.empty(width * height * 4, np.float32)
+        # The output is 8-bit, so the channels are converted to bytes as they are copied
+        out_buf = np.full((height, width, 4), 255, np.uint8)
 
         for image in images:
-            if image.size[0] == width and image.size[1] == height:
+            if image.size[0] >= width and image.size[1] >= height:
+                tmp_buf = np.empty(image.size[0] * image.size[1] * 4, np.float32)
                 image.pixels.foreach_get(tmp_buf)
+                # Scale down with NumPy if the image is larger than the output
+                tmp_pixels = resize(tmp_buf.reshape(image.size[1], image.size[0], 4), width, height)
             else:
-                # Image is the wrong size; make a temp copy and scale it.
+                # Image is too small; make a temp copy and scale it up.
+                tmp_buf = np.empty(width * height * 4, np.float32)
                 with TmpImageGuard() as guard:
                     _make_temp_image_copy(guard, src_image=image)
                     tmp_image = guard.image
                     tmp_image.scale(width, height)
                     tmp_image.pixels.foreach_get(tmp_buf)
+                tmp_pixels = tmp_buf.reshape(height, width, 4)
 
             # Copy any channels for this image to the output
             for dst_chan, fill in self.fills.items():
                 if isinstance(fill, FillImage) and fill.image == image:
-                    out_buf[int(dst_chan)::4] = tmp_buf[int(fill.src_chan)::4]
+                    out_buf[:, :, int(dst_chan)] = _float_to_byte(tmp_pixels[:, :, int(fill.src_chan)])
+
+        tmp_buf = tmp_pixels = None  # GC this
 
-        tmp_buf = None  # GC this
+        return self.__encode_from_numpy_array(out_buf)
 
-        return self.__encode_from_numpy_array(out_buf, (width, height))
+    def __encode_from_numpy_array(self, pixels: np.ndarray) -> Callable[[], bytes]:
+        """Encode (height, width, 4) uint8 pixels, bottom row first as in Blender."""
+        channels = 4 if Channel.A in self.fills else 3
 
-    def __encode_from_numpy_array(self, pixels: np.ndarray, dim: Tuple[int, int]) -> bytes:
+        if self.file_format == 'DDS':
+            pixels = pixels[::-1].copy()
+            if self.dds_compression == BC5:
+                # BC5 is used for normal maps, which MSFS expects with the green channel flipped (DirectX convention)
+                pixels[:, :, 1] = 255 - pixels[:, :, 1]
+            compression = self.dds_compression
+            return lambda: encode_dds(pixels, compression)
+
+        if self.file_format == 'PNG':
+            # Encoded without Blender, so the compression runs when the deferred encoding is finished
+            pixels = np.ascontiguousarray(pixels[::-1, :, :channels])
+            compression = self.png_compression
+            return lambda: encode_png(pixels, compression)
+
+        height, width, _ = pixels.shape
         with TmpImageGuard() as guard:
             guard.image = bpy.data.images.new(
                 "##gltf-export:tmp-image##",
-                width=dim[0],
-                height=dim[1],
-                alpha=Channel.A in self.fills,
+                width=width,
+                height=height,
+                alpha=channels == 4,
             )
             tmp_image = guard.image
 
-            tmp_image.pixels.foreach_set(pixels)
+            tmp_image.pixels.foreach_set(pixels.reshape(-1) / np.float32(255))
 
-            return _encode_temp_image(tmp_image, self.file_format)
+            data = _encode_temp_image(tmp_image, self.file_format)
+            return lambda: data
 
-    def __encode_from_image(self, image: bpy.types.Image) -> bytes:
+    def __reuse_image_file(self, image: bpy.types.Image) -> Optional[Callable[[], bytes]]:
         # See if there is an existing file we can use.
-        data = None
         if image.source == 'FILE' and image.file_format == self.file_format and \
                 not image.is_dirty:
             if image.packed_file is not None:
                 data = image.packed_file.data
+                if _has_magic_number(data, self.file_format):
+                    return lambda: data
             else:
                 src_path = bpy.path.abspath(image.filepath_raw)
                 if os.path.isfile(src_path):
+                    # Only check the header here, the file is read when the data is needed
                     with open(src_path, 'rb') as f:
-                        data = f.read()
-        # Check magic number is right
-        if data:
-            if self.file_format == 'PNG':
-                if data.startswith(b'\x89PNG'):
-                    return data
-            elif self.file_format == 'JPEG':
-                if data.startswith(b'\xff\xd8\xff'):
-                    return data
+                        header = f.read(4)
+                    if _has_magic_number(header, self.file_format):
+                        return lambda: _read_file(src_path)
+        return None
 
+    def __encode_from_image(self, image: bpy.types.Image) -> bytes:
         # Copy to a temp image and save.
         with TmpImageGuard() as guard:
             _make_temp_image_copy(guard, src_image=image)
@@ -204,6 +314,40 @@ class ExportImage:
             return _encode_temp_image(tmp_image, self.file_format)
 
 
+def _image_content_hash(image: bpy.types.Image, cache: ImageCache) -> str:
+    if image.source == 'FILE' and not image.is_dirty:
+        if image.packed_file is not None:
+            return hashlib.sha256(image.packed_file.data).hexdigest()
+        src_path = bpy.path.abspath(image.filepath_raw)
+        if os.path.isfile(src_path):
+            return cache.file_hash(src_path)
+
+    # Generated or edited image, hash its pixels
+    pixels = np.empty(image.size[0] * image.size[1] * image.channels, np.float32)
+    image.pixels.foreach_get(pixels)
+    return hashlib.sha256(pixels).hexdigest()
+
+
+def _float_to_byte(values: np.ndarray) -> np.ndarray:
+    # Same rounding as Blender uses when storing float pixels in a byte image
+    return (np.clip(values, 0.0, 1.0) * np.float32(255) + np.float32(0.5)).astype(np.uint8)
+
+
+def _has_magic_number(data: bytes, file_format: str) -> bool:
+    if not data:
+        return False
+    if file_format == 'PNG':
+        return data.startswith(b'\x89PNG')
+    elif file_format == 'JPEG':
+        return data.startswith(b'\xff\xd8\xff')
+    return False
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
 def _encode_temp_image(tmp_image: bpy.types.Image, file_format: str) -> bytes:
     with tempfile.TemporaryDirectory() as tmpdirname:
         tmpfilename = tmpdirname + '/img'
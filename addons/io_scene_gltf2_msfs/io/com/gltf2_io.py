@@ -16,7 +16,7 @@
 # command used:
 # quicktype --src glTF.schema.json --src-lang schema -t gltf --lang python --python-version 3.5
 
-# TODO: add __slots__ to all classes by extending the generator
+# NOTE: __slots__ are declared on all classes (added by hand), including the attributes the importer sets on them
 
 # TODO: REMOVE traceback import
 
@@ -117,6 +117,8 @@ class AccessorSparseIndices:
     Indices of those attributes that deviate from their initialization value.
     """
 
+    __slots__ = ('buffer_view', 'byte_offset', 'component_type', 'extensions', 'extras')
+
     def __init__(self, buffer_view, byte_offset, component_type, extensions, extras):
         self.buffer_view = buffer_view
         self.byte_offset = byte_offset
@@ -155,6 +157,8 @@ class AccessorSparseValues:
     accessor attributes pointed by `accessor.sparse.indices`.
     """
 
+    __slots__ = ('buffer_view', 'byte_offset', 'extensions', 'extras')
+
     def __init__(self, buffer_view, byte_offset, extensions, extras):
         self.buffer_view = buffer_view
         self.byte_offset = byte_offset
@@ -184,6 +188,8 @@ class AccessorSparseValues:
 class AccessorSparse:
     """Sparse storage of attributes that deviate from their initialization value."""
 
+    __slots__ = ('count', 'extensions', 'extras', 'indices', 'values')
+
     def __init__(self, count, extensions, extras, indices, values):
         self.count = count
         self.extensions = extensions
@@ -219,6 +225,9 @@ class Accessor:
     WebGL's `vertexAttribPointer()` defines an attribute in a buffer.
     """
 
+    __slots__ = ('buffer_view', 'byte_offset', 'component_type', 'count', 'extensions', 'extras', 'min', 'max',
+                 'normalized', 'sparse', 'type', 'name')
+
     def __init__(self, buffer_view, byte_offset, component_type, count, extensions, extras, min, max, normalized,
                  sparse, type, name):
         self.buffer_view = buffer_view
@@ -277,6 +286,8 @@ class AnimationChannelTarget:
     The index of the node and TRS property that an animation channel targets.
     """
 
+    __slots__ = ('extensions', 'extras', 'node', 'path')
+
     def __init__(self, extensions, extras, node, path):
         self.extensions = extensions
         self.extras = extras
@@ -306,6 +317,8 @@ class AnimationChannelTarget:
 class AnimationChannel:
     """Targets an animation's sampler at a node's property."""
 
+    __slots__ = ('extensions', 'extras', 'sampler', 'target')
+
     def __init__(self, extensions, extras, sampler, target):
         self.extensions = extensions
         self.extras = extras
@@ -337,6 +350,8 @@ class AnimationSampler:
     graph (but not its target).
     """
 
+    __slots__ = ('extensions', 'extras', 'input', 'output', 'interpolation')
+
     def __init__(self, extensions, extras, input, output, interpolation):
         self.extensions = extensions
         self.extras = extras
@@ -369,6 +384,10 @@ class AnimationSampler:
 class Animation:
     """A keyframe animation."""
 
+    __slots__ = ('name', 'channels', 'extensions', 'extras', 'samplers',
+                 # set by the importer
+                 'track_name')
+
     def __init__(self, name, channels, extensions, extras, samplers):
         self.name = name
         self.channels = channels
@@ -401,6 +420,8 @@ class Animation:
 class Asset:
     """Metadata about the glTF asset."""
 
+    __slots__ = ('copyright', 'extras', 'generator', 'min_version', 'version', 'extensions')
+
     def __init__(self, copyright, extras, generator, min_version, version, extensions):
         self.copyright = copyright
         self.extras = extras
@@ -436,6 +457,8 @@ class Asset:
 class BufferView:
     """A view into a buffer generally representing a subset of the buffer."""
 
+    __slots__ = ('buffer', 'byte_length', 'byte_stride', 'byte_offset', 'extensions', 'extras', 'target', 'name')
+
     def __init__(self, buffer, byte_length, byte_stride, byte_offset, extensions, extras, target, name):
         self.buffer = buffer
         self.byte_length = byte_length
@@ -477,6 +500,8 @@ class BufferView:
 class Buffer:
     """A buffer points to binary geometry, animation, or skins."""
 
+    __slots__ = ('byte_length', 'extensions', 'name', 'uri', 'extras')
+
     def __init__(self, byte_length, extensions, name, uri, extras):
         self.byte_length = byte_length
         self.extensions = extensions
@@ -509,6 +534,8 @@ class Buffer:
 class CameraOrthographic:
     """An orthographic camera containing properties to create an orthographic projection matrix."""
 
+    __slots__ = ('extensions', 'extras', 'xmag', 'ymag', 'zfar', 'znear')
+
     def __init__(self, extensions, extras, xmag, ymag, zfar, znear):
         self.extensions = extensions
         self.extras = extras
@@ -544,6 +571,8 @@ class CameraOrthographic:
 class CameraPerspective:
     """A perspective camera containing properties to create a perspective projection matrix."""
 
+    __slots__ = ('aspect_ratio', 'extensions', 'extras', 'yfov', 'zfar', 'znear')
+
     def __init__(self, aspect_ratio, extensions, extras, yfov, zfar, znear):
         self.aspect_ratio = aspect_ratio
         self.extensions = extensions
@@ -581,6 +610,8 @@ class Camera:
     camera in the scene.
     """
 
+    __slots__ = ('extensions', 'extras', 'name', 'orthographic', 'perspective', 'type')
+
     def __init__(self, extensions, extras, name, orthographic, perspective, type):
         self.extensions = extensions
         self.extras = extras
@@ -618,6 +649,10 @@ class Image:
     index. `mimeType` is required in the latter case.
     """
 
+    __slots__ = ('buffer_view', 'extensions', 'extras', 'mime_type', 'name', 'uri',
+                 # set by the importer
+                 'blender_image_name')
+
     def __init__(self, buffer_view, extensions, extras, mime_type, name, uri):
         self.buffer_view = buffer_view
         self.extensions = extensions
@@ -660,6 +695,8 @@ class TextureInfo:
     Reference to a texture.
     """
 
+    __slots__ = ('extensions', 'extras', 'index', 'tex_coord')
+
     def __init__(self, extensions, extras, index, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -692,6 +729,8 @@ class MaterialNormalTextureInfoClass:
     Reference to a texture.
     """
 
+    __slots__ = ('extensions', 'extras', 'index', 'scale', 'tex_coord')
+
     def __init__(self, extensions, extras, index, scale, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -727,6 +766,8 @@ class MaterialOcclusionTextureInfoClass:
     Reference to a texture.
     """
 
+    __slots__ = ('extensions', 'extras', 'index', 'strength', 'tex_coord')
+
     def __init__(self, extensions, extras, index, strength, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -765,6 +806,9 @@ class MaterialPBRMetallicRoughness:
     from Physically-Based Rendering (PBR) methodology.
     """
 
+    __slots__ = ('base_color_factor', 'extensions', 'extras', 'metallic_factor', 'roughness_factor',
+                 'base_color_texture', 'metallic_roughness_texture')
+
     def __init__(self, base_color_factor, extensions, extras, metallic_factor, roughness_factor,
                  base_color_texture, metallic_roughness_texture):
         self.base_color_factor = base_color_factor
@@ -807,6 +851,11 @@ class MaterialPBRMetallicRoughness:
 class Material:
     """The material appearance of a primitive."""
 
+    __slots__ = ('name', 'alpha_cutoff', 'alpha_mode', 'double_sided', 'normal_texture', 'occlusion_texture',
+                 'emissive_texture', 'emissive_factor', 'pbr_metallic_roughness', 'extensions', 'extras',
+                 # set by the importer
+                 'blender_material')
+
     def __init__(self, name, alpha_cutoff, alpha_mode, double_sided, normal_texture, occlusion_texture, emissive_texture,
                  emissive_factor, pbr_metallic_roughness, extensions, extras):
         self.name = name
@@ -864,6 +913,10 @@ class Material:
 class MeshPrimitive:
     """Geometry to be rendered with the given material."""
 
+    __slots__ = ('attributes', 'extensions', 'indices', 'material', 'mode', 'extras', 'targets',
+                 # set by the importer
+                 'num_faces')
+
     def __init__(self, attributes, extensions, indices, material, mode, extras, targets):
         self.attributes = attributes
         self.extensions = extensions
@@ -905,6 +958,10 @@ class Mesh:
     places the mesh in the scene.
     """
 
+    __slots__ = ('extensions', 'extras', 'primitives', 'name', 'weights',
+                 # set by the importer
+                 'blender_name', 'shapekey_names')
+
     def __init__(self, extensions, extras, primitives, name, weights):
         self.extensions = extensions
         self.extras = extras
@@ -945,6 +1002,11 @@ class Node:
     may be present; `matrix` will not be present.
     """
 
+    __slots__ = ('camera', 'extensions', 'extras', 'matrix', 'translation', 'rotation', 'scale', 'mesh', 'skin',
+                 'name', 'children', 'weights',
+                 # set by the importer
+                 'weight_animation', 'animations')
+
     def __init__(self, camera, extensions, extras, matrix, translation, rotation, scale, mesh, skin, name, children,
                  weights):
         self.camera = camera
@@ -1000,6 +1062,8 @@ class Node:
 class Sampler:
     """Texture sampler properties for filtering and wrapping modes."""
 
+    __slots__ = ('extensions', 'extras', 'mag_filter', 'min_filter', 'name', 'wrap_s', 'wrap_t')
+
     def __init__(self, extensions, extras, mag_filter, min_filter, name, wrap_s, wrap_t):
         self.extensions = extensions
         self.extras = extras
@@ -1038,6 +1102,8 @@ class Sampler:
 class Scene:
     """The root nodes of a scene."""
 
+    __slots__ = ('extensions', 'extras', 'name', 'nodes')
+
     def __init__(self, extensions, extras, name, nodes):
         self.extensions = extensions
         self.extras = extras
@@ -1067,6 +1133,8 @@ class Scene:
 class Skin:
     """Joints and matrices defining a skin."""
 
+    __slots__ = ('extensions', 'extras', 'inverse_bind_matrices', 'joints', 'skeleton', 'name')
+
     def __init__(self, extensions, extras, inverse_bind_matrices, joints, skeleton, name):
         self.extensions = extensions
         self.extras = extras
@@ -1102,6 +1170,8 @@ class Skin:
 class Texture:
     """A texture and its sampler."""
 
+    __slots__ = ('extensions', 'extras', 'name', 'sampler', 'source')
+
     def __init__(self, extensions, extras, name, sampler, source):
         self.extensions = extensions
         self.extras = extras
@@ -1134,6 +1204,10 @@ class Texture:
 class Gltf:
     """The root object for a glTF asset."""
 
+    __slots__ = ('accessors', 'animations', 'asset', 'buffers', 'buffer_views', 'cameras', 'extensions',
+                 'extensions_required', 'extensions_used', 'extras', 'images', 'materials', 'meshes', 'nodes',
+                 'samplers', 'scene', 'scenes', 'skins', 'textures')
+
     def __init__(self, accessors, animations, asset, buffers, buffer_views, cameras, extensions, extensions_required,
                  extensions_used, extras, images, materials, meshes, nodes, samplers, scene, scenes, skins, textures):
         self.accessors = accessors
@@ -0,0 +1,412 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors, FlyByWire Simulations.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Schema driven parsing of glTF JSON dicts into the gltf2_io classes.
+#
+# The generated from_dict methods check every value through from_union, which tries each converter and catches the
+# AssertionError of the ones that do not match. On large files most of the time goes into raising and catching these
+# exceptions. The parsers below check types with plain isinstance branches and return _INVALID instead of raising.
+# Whenever a value is rejected, the whole document is parsed again with the validating gltf2_io path, so malformed
+# files still fail with the same errors as before.
+#
+# The field tables also give the JSON keys the exporter writes, see get_json_fields.
+#
+# NOTE: the field tables mirror the from_dict / to_dict methods in gltf2_io.py (same keys, in the same order) and
+# must be kept in sync with them.
+
+from io_scene_gltf2_msfs.io.com import gltf2_io
+from io_scene_gltf2_msfs.io.com.gltf2_io import Accessor, AccessorSparse, AccessorSparseIndices, AccessorSparseValues
+from io_scene_gltf2_msfs.io.com.gltf2_io import Animation, AnimationChannel, AnimationChannelTarget, AnimationSampler
+from io_scene_gltf2_msfs.io.com.gltf2_io import Asset, Buffer, BufferView, Camera, CameraOrthographic, CameraPerspective
+from io_scene_gltf2_msfs.io.com.gltf2_io import Gltf, Image, Material, MaterialNormalTextureInfoClass
+from io_scene_gltf2_msfs.io.com.gltf2_io import MaterialOcclusionTextureInfoClass, MaterialPBRMetallicRoughness
+from io_scene_gltf2_msfs.io.com.gltf2_io import Mesh, MeshPrimitive, Node, Sampler, Scene, Skin, Texture, TextureInfo
+
+
+_INVALID = object()
+
+
+def gltf_from_dict(s):
+    gltf = _parse_object(Gltf, s)
+    if gltf is _INVALID:
+        return gltf2_io.gltf_from_dict(s)
+    return gltf
+
+
+def _parse_object(cls, obj):
+    if not isinstance(obj, dict):
+        return _INVALID
+    values = {}
+    for key, attribute, parse in _fields[cls]:
+        value = parse(obj.get(key))
+        if value is _INVALID:
+            return _INVALID
+        values[attribute] = value
+    return cls(**values)
+
+
+# Each kind is a parser, matching the from_* helpers used by the generated code.
+
+def _int(x):
+    if isinstance(x, int) and not isinstance(x, bool):
+        return x
+    return _INVALID
+
+
+def _float(x):
+    if isinstance(x, float):
+        return x
+    if isinstance(x, int) and not isinstance(x, bool):
+        return float(x)
+    return _INVALID
+
+
+def _str(x):
+    if isinstance(x, str):
+        return x
+    return _INVALID
+
+
+def _bool(x):
+    if isinstance(x, bool):
+        return x
+    return _INVALID
+
+
+def _extensions(x):
+    if not isinstance(x, dict):
+        return _INVALID
+    result = {}
+    for name, extension in x.items():
+        if not isinstance(extension, dict):
+            return _INVALID
+        result[name] = dict(extension)
+    return result
+
+
+_INT = _int
+_FLOAT = _float
+_STR = _str
+_BOOL = _bool
+_EXTRAS = lambda x: x
+_EXTENSIONS = _extensions
+
+
+def _optional(parse):
+    return lambda x: None if x is None else parse(x)
+
+
+def _list_of(parse):
+    def parse_list(x):
+        if not isinstance(x, list):
+            return _INVALID
+        result = [parse(y) for y in x]
+        if _INVALID in result:
+            return _INVALID
+        return result
+    return parse_list
+
+
+def _dict_of(parse):
+    def parse_dict(x):
+        if not isinstance(x, dict):
+            return _INVALID
+        result = {k: parse(v) for (k, v) in x.items()}
+        if _INVALID in result.values():
+            return _INVALID
+        return result
+    return parse_dict
+
+
+def _object(cls):
+    return lambda x: _parse_object(cls, x)
+
+
+# (json key, attribute, kind) of each property, in the order used by gltf2_io.
+_fields = {}
+
+_fields[AccessorSparseIndices] = (
+    ('bufferView', 'buffer_view', _INT),
+    ('byteOffset', 'byte_offset', _optional(_INT)),
+    ('componentType', 'component_type', _INT),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+)
+
+_fields[AccessorSparseValues] = (
+    ('bufferView', 'buffer_view', _INT),
+    ('byteOffset', 'byte_offset', _optional(_INT)),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+)
+
+_fields[AccessorSparse] = (
+    ('count', 'count', _INT),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('indices', 'indices', _object(AccessorSparseIndices)),
+    ('values', 'values', _object(AccessorSparseValues)),
+)
+
+_fields[Accessor] = (
+    ('bufferView', 'buffer_view', _optional(_INT)),
+    ('byteOffset', 'byte_offset', _optional(_INT)),
+    ('componentType', 'component_type', _INT),
+    ('count', 'count', _INT),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('min', 'min', _optional(_list_of(_FLOAT))),
+    ('max', 'max', _optional(_list_of(_FLOAT))),
+    ('normalized', 'normalized', _optional(_BOOL)),
+    ('sparse', 'sparse', _optional(_object(AccessorSparse))),
+    ('type', 'type', _STR),
+    ('name', 'name', _optional(_STR)),
+)
+
+_fields[AnimationChannelTarget] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('node', 'node', _optional(_INT)),
+    ('path', 'path', _STR),
+)
+
+_fields[AnimationChannel] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('sampler', 'sampler', _INT),
+    ('target', 'target', _object(AnimationChannelTarget)),
+)
+
+_fields[AnimationSampler] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('input', 'input', _INT),
+    ('output', 'output', _INT),
+    ('interpolation', 'interpolation', _optional(_STR)),
+)
+
+_fields[Animation] = (
+    ('name', 'name', _optional(_STR)),
+    ('channels', 'channels', _list_of(_object(AnimationChannel))),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('samplers', 'samplers', _list_of(_object(AnimationSampler))),
+)
+
+_fields[Asset] = (
+    ('copyright', 'copyright', _optional(_STR)),
+    ('extras', 'extras', _EXTRAS),
+    ('generator', 'generator', _optional(_STR)),
+    ('minVersion', 'min_version', _optional(_STR)),
+    ('version', 'version', _STR),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+)
+
+_fields[BufferView] = (
+    ('buffer', 'buffer', _INT),
+    ('byteLength', 'byte_length', _INT),
+    ('byteStride', 'byte_stride', _optional(_INT)),
+    ('byteOffset', 'byte_offset', _optional(_INT)),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('target', 'target', _optional(_INT)),
+    ('name', 'name', _optional(_STR)),
+)
+
+_fields[Buffer] = (
+    ('byteLength', 'byte_length', _INT),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('name', 'name', _optional(_STR)),
+    ('uri', 'uri', _optional(_STR)),
+    ('extras', 'extras', _EXTRAS),
+)
+
+_fields[CameraOrthographic] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('xmag', 'xmag', _FLOAT),
+    ('ymag', 'ymag', _FLOAT),
+    ('zfar', 'zfar', _FLOAT),
+    ('znear', 'znear', _FLOAT),
+)
+
+_fields[CameraPerspective] = (
+    ('aspectRatio', 'aspect_ratio', _optional(_FLOAT)),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('yfov', 'yfov', _FLOAT),
+    ('zfar', 'zfar', _optional(_FLOAT)),
+    ('znear', 'znear', _FLOAT),
+)
+
+_fields[Camera] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('name', 'name', _optional(_STR)),
+    ('orthographic', 'orthographic', _optional(_object(CameraOrthographic))),
+    ('perspective', 'perspective', _optional(_object(CameraPerspective))),
+    ('type', 'type', _STR),
+)
+
+_fields[Image] = (
+    ('bufferView', 'buffer_view', _optional(_INT)),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('mimeType', 'mime_type', _optional(_STR)),
+    ('name', 'name', _optional(_STR)),
+    ('uri', 'uri', _optional(_STR)),
+)
+
+_fields[TextureInfo] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('index', 'index', _INT),
+    ('texCoord', 'tex_coord', _optional(_INT)),
+)
+
+_fields[MaterialNormalTextureInfoClass] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('index', 'index', _INT),
+    ('scale', 'scale', _optional(_FLOAT)),
+    ('texCoord', 'tex_coord', _optional(_INT)),
+)
+
+_fields[MaterialOcclusionTextureInfoClass] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('index', 'index', _INT),
+    ('strength', 'strength', _optional(_FLOAT)),
+    ('texCoord', 'tex_coord', _optional(_INT)),
+)
+
+_fields[MaterialPBRMetallicRoughness] = (
+    ('baseColorFactor', 'base_color_factor', _optional(_list_of(_FLOAT))),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('metallicFactor', 'metallic_factor', _optional(_FLOAT)),
+    ('roughnessFactor', 'roughness_factor', _optional(_FLOAT)),
+    ('baseColorTexture', 'base_color_texture', _optional(_object(TextureInfo))),
+    ('metallicRoughnessTexture', 'metallic_roughness_texture', _optional(_object(TextureInfo))),
+)
+
+_fields[Material] = (
+    ('name', 'name', _optional(_STR)),
+    ('alphaCutoff', 'alpha_cutoff', _optional(_FLOAT)),
+    ('alphaMode', 'alpha_mode', _optional(_STR)),
+    ('doubleSided', 'double_sided', _optional(_BOOL)),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('normalTexture', 'normal_texture', _optional(_object(MaterialNormalTextureInfoClass))),
+    ('occlusionTexture', 'occlusion_texture', _optional(_object(MaterialOcclusionTextureInfoClass))),
+    ('emissiveTexture', 'emissive_texture', _optional(_object(TextureInfo))),
+    ('emissiveFactor', 'emissive_factor', _optional(_list_of(_FLOAT))),
+    ('pbrMetallicRoughness', 'pbr_metallic_roughness', _optional(_object(MaterialPBRMetallicRoughness))),
+)
+
+_fields[MeshPrimitive] = (
+    ('attributes', 'attributes', _dict_of(_INT)),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('indices', 'indices', _optional(_INT)),
+    ('material', 'material', _optional(_INT)),
+    ('mode', 'mode', _optional(_INT)),
+    ('extras', 'extras', _EXTRAS),
+    ('targets', 'targets', _optional(_list_of(_dict_of(_INT)))),
+)
+
+_fields[Mesh] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('primitives', 'primitives', _list_of(_object(MeshPrimitive))),
+    ('name', 'name', _optional(_STR)),
+    ('weights', 'weights', _optional(_list_of(_FLOAT))),
+)
+
+_fields[Node] = (
+    ('camera', 'camera', _optional(_INT)),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('matrix', 'matrix', _optional(_list_of(_FLOAT))),
+    ('translation', 'translation', _optional(_list_of(_FLOAT))),
+    ('rotation', 'rotation', _optional(_list_of(_FLOAT))),
+    ('scale', 'scale', _optional(_list_of(_FLOAT))),
+    ('mesh', 'mesh', _optional(_INT)),
+    ('skin', 'skin', _optional(_INT)),
+    ('name', 'name', _optional(_STR)),
+    ('children', 'children', _optional(_list_of(_INT))),
+    ('weights', 'weights', _optional(_list_of(_FLOAT))),
+)
+
+_fields[Sampler] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('magFilter', 'mag_filter', _optional(_INT)),
+    ('minFilter', 'min_filter', _optional(_INT)),
+    ('name', 'name', _optional(_STR)),
+    ('wrapS', 'wrap_s', _optional(_INT)),
+    ('wrapT', 'wrap_t', _optional(_INT)),
+)
+
+_fields[Scene] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('name', 'name', _optional(_STR)),
+    ('nodes', 'nodes', _optional(_list_of(_INT))),
+)
+
+_fields[Skin] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('inverseBindMatrices', 'inverse_bind_matrices', _optional(_INT)),
+    ('joints', 'joints', _list_of(_INT)),
+    ('skeleton', 'skeleton', _optional(_INT)),
+    ('name', 'name', _optional(_STR)),
+)
+
+_fields[Texture] = (
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extras', 'extras', _EXTRAS),
+    ('name', 'name', _optional(_STR)),
+    ('sampler', 'sampler', _optional(_INT)),
+    ('source', 'source', _optional(_INT)),
+)
+
+_fields[Gltf] = (
+    ('accessors', 'accessors', _optional(_list_of(_object(Accessor)))),
+    ('animations', 'animations', _optional(_list_of(_object(Animation)))),
+    ('asset', 'asset', _object(Asset)),
+    ('buffers', 'buffers', _optional(_list_of(_object(Buffer)))),
+    ('bufferViews', 'buffer_views', _optional(_list_of(_object(BufferView)))),
+    ('cameras', 'cameras', _optional(_list_of(_object(Camera)))),
+    ('extensions', 'extensions', _optional(_EXTENSIONS)),
+    ('extensionsRequired', 'extensions_required', _optional(_list_of(_STR))),
+    ('extensionsUsed', 'extensions_used', _optional(_list_of(_STR))),
+    ('extras', 'extras', _EXTRAS),
+    ('images', 'images', _optional(_list_of(_object(Image)))),
+    ('materials', 'materials', _optional(_list_of(_object(Material)))),
+    ('meshes', 'meshes', _optional(_list_of(_object(Mesh)))),
+    ('nodes', 'nodes', _optional(_list_of(_object(Node)))),
+    ('samplers', 'samplers', _optional(_list_of(_object(Sampler)))),
+    ('scene', 'scene', _optional(_INT)),
+    ('scenes', 'scenes', _optional(_list_of(_object(Scene)))),
+    ('skins', 'skins', _optional(_list_of(_object(Skin)))),
+    ('textures', 'textures', _optional(_list_of(_object(Texture)))),
+)
+
+_json_fields = {cls: tuple((key, attribute) for key, attribute, _ in fields) for cls, fields in _fields.items()}
+
+
+def get_json_fields(cls):
+    """Return the (json key, attribute) pairs of a gltf2_io class, or None for any other type."""
+    return _json_fields.get(cls)
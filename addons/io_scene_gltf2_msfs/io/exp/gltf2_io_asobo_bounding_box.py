@@ -0,0 +1,102 @@
+# Copyright 2021 FlyByWire Simulations.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from io_scene_gltf2_msfs.io.com.gltf2_io_debug import print_console
+
+# Signs selecting min (0) or max (1) for each of the 8 corners of a box
+CORNERS = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=bool)
+
+
+def node_matrix(node) -> np.ndarray:
+    """The local 4x4 transform of a glTF node, from its matrix or its translation, rotation and scale."""
+    if node.matrix is not None:
+        return np.array(node.matrix, dtype=np.float64).reshape(4, 4).T  # glTF matrices are column major
+
+    matrix = np.identity(4)
+    if node.scale is not None:
+        matrix[:3, :3] = np.diag(node.scale)
+    if node.rotation is not None:
+        x, y, z, w = node.rotation
+        rotation = np.array([
+            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+        ])
+        matrix[:3, :3] = rotation @ matrix[:3, :3]
+    if node.translation is not None:
+        matrix[:3, 3] = node.translation
+    return matrix
+
+
+class AsoboBoundingBox():
+    """
+    Bounding box of all meshes of the exported scenes, in scene space, for the ASOBO_asset_optimized extension.
+
+    The local bounds of each mesh are computed once from the min and max of its POSITION accessors. Every node using
+    the mesh then only transforms the 8 corners of those bounds by its world matrix.
+    """
+
+    def __init__(self):
+        self.min = np.full(3, np.inf)
+        self.max = np.full(3, -np.inf)
+        self.__mesh_bounds = {}
+        self.instances = 0
+
+    def traverse_scenes(self, scenes):
+        for scene in scenes:
+            for node in scene.nodes:
+                self.__traverse_node(node, np.identity(4))
+
+        print_console('DEBUG', 'Asobo bounding box: {} meshes, {} instances'.format(
+            len(self.__mesh_bounds), self.instances))
+
+    def __traverse_node(self, node, parent_matrix):
+        matrix = parent_matrix @ node_matrix(node)
+        if node.mesh is not None:
+            # Skinned meshes are exported in scene space, their node transform doesn't apply
+            self.__add_mesh(node.mesh, np.identity(4) if node.skin is not None else matrix)
+        if not (node.children is None):
+            for child in node.children:
+                self.__traverse_node(child, matrix)
+
+    def __add_mesh(self, mesh, matrix):
+        bounds = self.__mesh_bounds.get(id(mesh))
+        if bounds is None:
+            bounds = self.__mesh_bounds[id(mesh)] = self.__get_mesh_bounds(mesh)
+        if bounds is None:
+            return
+        self.instances += 1
+
+        corners = np.where(CORNERS, bounds[1], bounds[0])
+        corners = corners @ matrix[:3, :3].T + matrix[:3, 3]
+        np.minimum(self.min, corners.min(axis=0), out=self.min)
+        np.maximum(self.max, corners.max(axis=0), out=self.max)
+
+    @staticmethod
+    def __get_mesh_bounds(mesh):
+        positions = [primitive.attributes['POSITION'] for primitive in mesh.primitives
+                     if 'POSITION' in primitive.attributes and primitive.attributes['POSITION'].min is not None]
+        if not positions:
+            return None
+        mesh_min = np.min([accessor.min for accessor in positions], axis=0)
+        mesh_max = np.max([accessor.max for accessor in positions], axis=0)
+        return mesh_min, mesh_max
+
+    def to_lists(self):
+        """The min and max corners as lists, or zeros if there are no meshes."""
+        if self.instances == 0:
+            return [0, 0, 0], [0, 0, 0]
+        return self.min.tolist(), self.max.tolist()
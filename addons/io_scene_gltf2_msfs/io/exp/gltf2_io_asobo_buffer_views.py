@@ -12,67 +12,170 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import base64
-import struct
 import numpy as np
 
 from io_scene_gltf2_msfs.io.com import gltf2_io
 from io_scene_gltf2_msfs.io.com import gltf2_io_constants
+from io_scene_gltf2_msfs.io.com.gltf2_io_debug import print_console
 from io_scene_gltf2_msfs.io.exp import gltf2_io_binary_data
+from io_scene_gltf2_msfs.io.exp.gltf2_io_buffer import DataURI
+
+# Interleaved vertex layouts used by the vertex buffer views of Asobo optimized meshes.
+# The field offsets are also used as the byte offsets of the attribute accessors.
+VERTEX_LAYOUT_VTX = np.dtype({
+    'names': ['POSITION', 'TANGENT', 'NORMAL', 'TEXCOORD_0', 'TEXCOORD_1', 'COLOR_0'],
+    'formats': [('<f4', 3), ('i1', 4), ('i1', 4), ('<f2', 2), ('<f2', 2), ('<u2', 4)],
+    'offsets': [0, 12, 16, 20, 24, 28],
+    'itemsize': 36,
+})
+
+VERTEX_LAYOUT_BLEND1 = np.dtype({
+    'names': ['POSITION', 'TANGENT', 'NORMAL', 'TEXCOORD_0', 'TEXCOORD_1', 'JOINTS_0', 'WEIGHTS_0', 'COLOR_0'],
+    'formats': [('<f4', 3), ('i1', 4), ('i1', 4), ('<f2', 2), ('<f2', 2), ('<u2', 4), '<f4', ('i1', 4)],
+    'offsets': [0, 12, 16, 20, 24, 28, 36, 40],
+    'itemsize': 44,
+})
+
+VERTEX_LAYOUT_BLEND4 = np.dtype({
+    'names': ['POSITION', 'TANGENT', 'NORMAL', 'TEXCOORD_0', 'TEXCOORD_1', 'JOINTS_0', 'WEIGHTS_0', 'COLOR_0'],
+    'formats': [('<f4', 3), ('i1', 4), ('i1', 4), ('<f2', 2), ('<f2', 2), ('<u2', 4), ('<u2', 4), ('i1', 4)],
+    'offsets': [0, 12, 16, 20, 24, 28, 36, 44],
+    'itemsize': 48,
+})
+
+
+def pack_vertices(layout: np.dtype, attributes: dict, count: int) -> np.ndarray:
+    """
+    Interleave the attribute arrays of a primitive into a structured array with the given vertex layout.
+
+    Attributes that are not part of the layout are skipped, missing ones are left zeroed.
+    """
+    vertices = np.zeros(count, dtype=layout)
+    for attribute, accessor in attributes.items():
+        if attribute not in layout.fields:
+            continue
+        column = vertices[attribute]
+        column[...] = np.asarray(accessor.buffer_view).reshape(column.shape)
+    return vertices
+
+
+def set_vertex_byte_offsets(layout: np.dtype, attributes: dict, offset: int):
+    """Set the byte offset of each attribute accessor to the offset of its field in the vertex layout."""
+    for attribute, accessor in attributes.items():
+        if attribute not in layout.fields:
+            continue
+        byte_offset = offset + layout.fields[attribute][1]
+        if byte_offset != 0:
+            accessor.byte_offset = byte_offset
+
+
+def merge_accessor_data(accessors) -> np.ndarray:
+    """Concatenate the data of several accessors into one array, preallocated from the accessor counts."""
+    arrays = [np.asarray(accessor.buffer_view) for accessor in accessors]
+    count = sum(accessor.count for accessor in accessors)
+    merged = np.empty((count,) + arrays[0].shape[1:], dtype=np.result_type(*arrays))
+    np.concatenate(arrays, axis=0, out=merged)
+    return merged
+
+
+def rewind_indices(indices: np.ndarray) -> np.ndarray:
+    """Reverse the winding order of a triangle list (this makes the faces render in the correct direction)."""
+    return np.ascontiguousarray(np.asarray(indices).reshape(-1, 3)[:, ::-1]).reshape(-1)
+
+
+def merge_indices(indices_list) -> np.ndarray:
+    """
+    Concatenate the indices of primitives that share one vertex buffer.
+
+    The indices of each primitive are offset by the highest index of the previous primitive plus one.
+    """
+    indices_list = [np.asarray(indices, dtype=np.int64) for indices in indices_list]
+    sizes = np.array([len(indices) for indices in indices_list], dtype=np.int64)
+    vertex_counts = np.array([indices.max() + 1 if len(indices) > 0 else 0 for indices in indices_list], dtype=np.int64)
+    base_indices = np.cumsum(vertex_counts) - vertex_counts
+
+    all_indices = np.concatenate(indices_list)
+    all_indices += np.repeat(base_indices, sizes)
+    return all_indices
+
+
+def get_start_indices(primitive_counts) -> np.ndarray:
+    """Get the StartIndex of each primitive in a merged index buffer from the primitive (triangle) counts."""
+    primitive_counts = np.asarray(primitive_counts, dtype=np.int64)
+    return (np.cumsum(primitive_counts) - primitive_counts) * 3
 
-STRUCT_POSITION = struct.Struct('fff')
-STRUCT_TANGENT = struct.Struct('bbbb')
-STRUCT_NORMAL = struct.Struct('bbbb')
-STRUCT_UV = struct.Struct('ee')
-STRUCT_JOINT = struct.Struct('HHHH')
-STRUCT_WEIGHT1 = struct.Struct('f')
-STRUCT_WEIGHT4 = struct.Struct('HHHH')
-STRUCT_COLOR_VTX = struct.Struct('HHHH')
-STRUCT_COLOR_BLEND = struct.Struct('bbbb')
 
 class AsoboBuffer:
+    """
+    Binary data of an Asobo buffer view.
+
+    Appended data is kept as a list of chunks together with the running byte length, so appending never
+    copies the data that is already in the buffer. NumPy arrays are referenced, not copied.
+    """
+
     def __init__(self, buffer_index=0):
-        self.__data = b''
+        self.__chunks = []
+        self.__byte_length = 0
         self.__buffer_index = buffer_index
 
-    def append_data(self, binary_data: gltf2_io_binary_data.BinaryData, check_padding=False, calculate_offset=False) -> gltf2_io.BufferView:
-        """Add binary data to the buffer. Return a glTF BufferView."""
+    def __append(self, data):
+        if isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+        view = memoryview(data).cast('B')
+        if len(view) > 0:
+            self.__chunks.append(view)
+            self.__byte_length += len(view)
+
+    def append_data(self, binary_data: gltf2_io_binary_data.BinaryData, check_padding=False, calculate_offset=False) -> int:
+        """Add binary data to the buffer. Return its offset if requested."""
         offset = None
         if calculate_offset:
-            offset = len(self.__data)
+            offset = self.__byte_length
 
-        self.__data += binary_data.data
+        self.__append(binary_data.data)
 
         # offsets should be a multiple of 4 --> therefore add padding if necessary
         if check_padding:
             padding = (4 - (binary_data.byte_length % 4)) % 4
             if padding != 0:
-                self.__data += b'\x00' * padding
+                self.__append(b'\x00' * padding)
 
         return offset
 
-    def append_bytes(self, binary_data: bytes, calculate_offset=False) -> gltf2_io.BufferView:
-        """Add binary data to the buffer. Return a glTF BufferView."""
+    def append_bytes(self, binary_data, check_padding=False, calculate_offset=False) -> int:
+        """Add bytes or a NumPy array to the buffer. Return its offset if requested."""
         offset = None
         if calculate_offset:
-            offset = len(self.__data)
+            offset = self.__byte_length
+
+        byte_length = self.__byte_length
+        self.__append(binary_data)
 
-        self.__data += binary_data
+        # offsets should be a multiple of 4 --> therefore add padding if necessary
+        if check_padding:
+            padding = (4 - ((self.__byte_length - byte_length) % 4)) % 4
+            if padding != 0:
+                self.__append(b'\x00' * padding)
 
         return offset
 
     @property
     def byte_length(self):
-        return len(self.__data)
+        return self.__byte_length
+
+    @property
+    def chunks(self):
+        return self.__chunks
 
     def to_bytes(self):
-        return self.__data
+        return b''.join(self.__chunks)
 
-    def to_embed_string(self):
-        return 'data:application/octet-stream;base64,' + base64.b64encode(self.__data).decode('ascii')
+    def to_data_uri(self):
+        return DataURI(self.__chunks)
 
     def clear(self):
-        self.__data = b''
+        self.__chunks = []
+        self.__byte_length = 0
 
 class AsoboBufferViews():
 
@@ -167,15 +270,19 @@ class AsoboBufferViews():
         )
 
         self.BufferViews = []
+        self.__buffer_view_indices = {} # Index of each used buffer view in BufferViews, keyed by id
+
+        self.Meshes = {} # Keep track of the meshes we have already handled, keyed by id (we need this since meshes can be shared across objects, and we don't want to handle a mesh twice)
 
-        self.Meshes = [] # Keep track of the meshes we have already handled (we need this since meshes can be shared across objects, and we don't want to handle a mesh twice)
+        self.lookups_saved = 0 # Number of mesh and buffer view lookups answered by the registries instead of a list scan
 
     def traverse_scenes(self, scenes):
         for scene in scenes:
             for node in scene.nodes:
                 self.__traverse_node(node, lambda node: self.__handle_node(node))
 
-    
+        print_console('DEBUG', 'Asobo buffer views: {} meshes packed, {} lookups saved'.format(len(self.Meshes), self.lookups_saved))
+
     def __traverse_node(self, node, f):
         f(node)
         if not (node.children is None):
@@ -184,11 +291,24 @@ class AsoboBufferViews():
 
     def __handle_node(self, node):
         if node.mesh is not None:
-            if node.mesh not in self.Meshes:
-                self.Meshes.append(node.mesh)
+            if id(node.mesh) in self.Meshes:
+                self.lookups_saved += 1
+            else:
+                self.Meshes[id(node.mesh)] = node.mesh
                 is_skinned_mesh = any('BLEND' in primitive.extras['ASOBO_primitive']['VertexType'] for primitive in node.mesh.primitives)
                 self.__handle_mesh(node.mesh, is_skinned_mesh)
 
+    def __get_buffer_view_index(self, buffer_view):
+        """Get the index of a buffer view in BufferViews, adding it first if it's not used yet."""
+        index = self.__buffer_view_indices.get(id(buffer_view))
+        if index is None:
+            index = len(self.BufferViews)
+            self.BufferViews.append(buffer_view)
+            self.__buffer_view_indices[id(buffer_view)] = index
+        else:
+            self.lookups_saved += 1
+        return index
+
     @staticmethod
     def get_primitive_attributes_count(primitive):
         attributes_count = [primitive.attributes[attribute].count for attribute in primitive.attributes] # Get a list of all attribute's count
@@ -206,27 +326,14 @@ class AsoboBufferViews():
                 # Gather indices
                 #
                 
-                indices = [] # Use a regular python list as appending is faster than using numpy
-
-                # Reverse indices (this makes the faces render in the correct direction)
-                for i in range(0, len(primitive.indices.buffer_view), 3):
-                    indices.append(primitive.indices.buffer_view[i + 2])
-                    indices.append(primitive.indices.buffer_view[i + 1])
-                    indices.append(primitive.indices.buffer_view[i + 0])
-
                 indices_accessor = primitive.indices
 
-                # Set data type
+                # Reverse indices and set data type
                 dtype = gltf2_io_constants.ComponentType.to_numpy_dtype_asobo(indices_accessor.component_type)
-                indices = np.array(indices, dtype=dtype)
+                indices = rewind_indices(indices_accessor.buffer_view).astype(dtype, copy=False)
 
-                binary_data = gltf2_io_binary_data.BinaryData(indices.tobytes())
-                offset = self.BufferViewIndex.buffer.append_data(binary_data, check_padding=True, calculate_offset=True)
-                if self.BufferViewIndex not in self.BufferViews:
-                    self.BufferViews.append(self.BufferViewIndex)
-
-
-                indices_accessor.buffer_view = self.BufferViews.index(self.BufferViewIndex)
+                offset = self.BufferViewIndex.buffer.append_bytes(indices, check_padding=True, calculate_offset=True)
+                indices_accessor.buffer_view = self.__get_buffer_view_index(self.BufferViewIndex)
                 if offset != 0:
                     indices_accessor.byte_offset = offset
                 indices_accessor.name = f'{mesh.name}_indices#{i}'
@@ -237,72 +344,24 @@ class AsoboBufferViews():
                 
                 is_blend4 = primitive.extras['ASOBO_primitive']['VertexType'] == 'BLEND4'
                 blend_buffer_view = self.BufferViewVertex4Blend if is_blend4 else self.BufferViewVertex1Blend
-                expected_byte_stride = 48 if is_blend4 else 44
+                vertex_layout = VERTEX_LAYOUT_BLEND4 if is_blend4 else VERTEX_LAYOUT_BLEND1
 
                 # Get amount of elements we want to add into the buffer
                 count = AsoboBufferViews.get_primitive_attributes_count(primitive)
 
-                buffer = bytearray(expected_byte_stride * count) # could possibly cause an error? might need to multiply by 3
-
                 # Assign offsets
                 offset = blend_buffer_view.buffer.byte_length
-                
-                if 'POSITION' in primitive.attributes:
-                    if offset != 0:
-                        primitive.attributes['POSITION'].byte_offset = offset
-                if 'TANGENT' in primitive.attributes:
-                    primitive.attributes['TANGENT'].byte_offset = offset + 12
-                if 'NORMAL' in primitive.attributes:
-                    primitive.attributes['NORMAL'].byte_offset = offset + 16
-                if 'TEXCOORD_0' in primitive.attributes:
-                    primitive.attributes['TEXCOORD_0'].byte_offset = offset + 20
-                if 'TEXCOORD_1' in primitive.attributes:
-                    primitive.attributes['TEXCOORD_1'].byte_offset = offset + 24
-                if 'JOINTS_0' in primitive.attributes:
-                    primitive.attributes['JOINTS_0'].byte_offset = offset + 28
-                if 'WEIGHTS_0' in primitive.attributes:
-                    primitive.attributes['WEIGHTS_0'].byte_offset = offset + 36
-                if 'COLOR_0' in primitive.attributes:
-                    if is_blend4:
-                        primitive.attributes['COLOR_0'].byte_offset = offset + 44
-                    else:
-                        primitive.attributes['COLOR_0'].byte_offset = offset + 40
-
-                for vidx in range(count):
-                    start = vidx * expected_byte_stride
-
-                    # Pack data into buffer
-
-                    if 'POSITION' in primitive.attributes:
-                        STRUCT_POSITION.pack_into(buffer, start, *primitive.attributes['POSITION'].buffer_view[vidx])
-                    if 'TANGENT' in primitive.attributes:
-                        STRUCT_TANGENT.pack_into(buffer, start + 12, *primitive.attributes['TANGENT'].buffer_view[vidx])
-                    if 'NORMAL' in primitive.attributes:
-                        STRUCT_NORMAL.pack_into(buffer, start + 16, *primitive.attributes['NORMAL'].buffer_view[vidx])
-                    if 'TEXCOORD_0' in primitive.attributes:
-                        STRUCT_UV.pack_into(buffer, start + 20, *primitive.attributes['TEXCOORD_0'].buffer_view[vidx])
-                    if 'TEXCOORD_1' in primitive.attributes:
-                        STRUCT_UV.pack_into(buffer, start + 24, *primitive.attributes['TEXCOORD_1'].buffer_view[vidx])
-                    if 'JOINTS_0' in primitive.attributes:
-                        STRUCT_JOINT.pack_into(buffer, start + 28, *primitive.attributes['JOINTS_0'].buffer_view[vidx])
-                    if 'WEIGHTS_0' in primitive.attributes:
-                        if is_blend4:
-                            STRUCT_WEIGHT4.pack_into(buffer, start + 36, *primitive.attributes['WEIGHTS_0'].buffer_view[vidx])
-                        else:
-                            STRUCT_WEIGHT1.pack_into(buffer, start + 36, *primitive.attributes['WEIGHTS_0'].buffer_view[vidx])
-                    if 'COLOR_0' in primitive.attributes:
-                        if is_blend4:
-                            STRUCT_COLOR_BLEND.pack_into(buffer, start + 44, *primitive.attributes['COLOR_0'].buffer_view[vidx])
-                        else:
-                            STRUCT_COLOR_BLEND.pack_into(buffer, start + 40, *primitive.attributes['COLOR_0'].buffer_view[vidx])
-
-                blend_buffer_view.buffer.append_bytes(bytes(buffer), calculate_offset=False)
-                if blend_buffer_view not in self.BufferViews:
-                    self.BufferViews.append(blend_buffer_view)
+                set_vertex_byte_offsets(vertex_layout, primitive.attributes, offset)
+
+                # Pack data into buffer
+                buffer = pack_vertices(vertex_layout, primitive.attributes, count)
+
+                blend_buffer_view.buffer.append_bytes(buffer, calculate_offset=False)
+                buffer_view_index = self.__get_buffer_view_index(blend_buffer_view)
 
                 # Set attribute names and  buffer view indexes
                 for attribute in primitive.attributes:
-                    primitive.attributes[attribute].buffer_view = self.BufferViews.index(blend_buffer_view)
+                    primitive.attributes[attribute].buffer_view = buffer_view_index
                     primitive.attributes[attribute].name = f'{mesh.name}_vertices#0_{attribute}'
 
         else: # Mesh is not skinned
@@ -314,15 +373,13 @@ class AsoboBufferViews():
             for attribute in mesh.primitives[0].attributes:
                 # Put all data into one accessor per attribute, and share across primitives
                 accessor = mesh.primitives[0].attributes[attribute] # Share the first primitive's accessors
-                buffer_views = []
-                for primitive in mesh.primitives:
-                    buffer_views.extend(primitive.attributes[attribute].buffer_view) # Add other primitive's data into the accessor
-                accessor.buffer_view = buffer_views
-                accessor.count = len(buffer_views) # Recalculate the count
+                buffer_view = merge_accessor_data([primitive.attributes[attribute] for primitive in mesh.primitives]) # Add other primitive's data into the accessor
+                accessor.buffer_view = buffer_view
+                accessor.count = len(buffer_view) # Recalculate the count
 
                 if attribute == 'POSITION': # Since we've put all the data into a shared accessor, we need to also recalculate the position accessor's min and max values
-                    accessor.min = list(map(float, np.amin(buffer_views, axis=0).tolist()))
-                    accessor.max = list(map(float, np.amax(buffer_views, axis=0).tolist()))
+                    accessor.min = list(map(float, buffer_view.min(axis=0).tolist()))
+                    accessor.max = list(map(float, buffer_view.max(axis=0).tolist()))
 
                 for primitive in mesh.primitives: # Set all primitives to use the shared accessor
                     primitive.attributes[attribute] = accessor
@@ -332,92 +389,45 @@ class AsoboBufferViews():
             #
 
             vertex_nd_buffer_view = self.BufferViewVertexND
-            expected_byte_stride = 36
 
             # Get amount of elements we want to add into the buffer
             count = AsoboBufferViews.get_primitive_attributes_count(primitive)
 
-            # Create an empty buffer with the expected size
-            buffer = bytearray(expected_byte_stride * count) # could possibly cause an error? might need to multiply by 3
-
             # Assign offsets
             offset = vertex_nd_buffer_view.buffer.byte_length
+            set_vertex_byte_offsets(VERTEX_LAYOUT_VTX, primitive.attributes, offset)
 
-            if 'POSITION' in primitive.attributes:
-                if offset != 0:
-                    primitive.attributes['POSITION'].byte_offset = offset
-            if 'TANGENT' in primitive.attributes:
-                primitive.attributes['TANGENT'].byte_offset = offset + 12
-            if 'NORMAL' in primitive.attributes:
-                primitive.attributes['NORMAL'].byte_offset = offset + 16
-            if 'TEXCOORD_0' in primitive.attributes:
-                primitive.attributes['TEXCOORD_0'].byte_offset = offset + 20
-            if 'TEXCOORD_1' in primitive.attributes:
-                primitive.attributes['TEXCOORD_1'].byte_offset = offset + 24
-            if 'COLOR_0' in primitive.attributes:
-                primitive.attributes['COLOR_0'].byte_offset = offset + 28
-
-            for vidx in range(count):
-                start = vidx * expected_byte_stride
-
-                # Pack data into buffer
-
-                if 'POSITION' in primitive.attributes:
-                    STRUCT_POSITION.pack_into(buffer, start, *primitive.attributes['POSITION'].buffer_view[vidx])
-                if 'TANGENT' in primitive.attributes:
-                    STRUCT_TANGENT.pack_into(buffer, start + 12, *primitive.attributes['TANGENT'].buffer_view[vidx])
-                if 'NORMAL' in primitive.attributes:
-                    STRUCT_NORMAL.pack_into(buffer, start + 16, *primitive.attributes['NORMAL'].buffer_view[vidx])
-                if 'TEXCOORD_0' in primitive.attributes:
-                    STRUCT_UV.pack_into(buffer, start + 20, *primitive.attributes['TEXCOORD_0'].buffer_view[vidx])
-                if 'TEXCOORD_1' in primitive.attributes:
-                    STRUCT_UV.pack_into(buffer, start + 24, *primitive.attributes['TEXCOORD_1'].buffer_view[vidx])
-                if 'COLOR_0' in primitive.attributes:
-                    STRUCT_COLOR_VTX.pack_into(buffer, start + 28, *primitive.attributes['COLOR_0'].buffer_view[vidx])
+            # Pack data into buffer
+            buffer = pack_vertices(VERTEX_LAYOUT_VTX, primitive.attributes, count)
 
             # Add data to the buffer view
-            vertex_nd_buffer_view.buffer.append_bytes(bytes(buffer), calculate_offset=False)
-            if vertex_nd_buffer_view not in self.BufferViews:
-                    self.BufferViews.append(vertex_nd_buffer_view)
+            vertex_nd_buffer_view.buffer.append_bytes(buffer, calculate_offset=False)
+            buffer_view_index = self.__get_buffer_view_index(vertex_nd_buffer_view)
 
             # Set attribute buffer view index
             for attribute in primitive.attributes:
-                primitive.attributes[attribute].buffer_view = self.BufferViews.index(vertex_nd_buffer_view)
+                primitive.attributes[attribute].buffer_view = buffer_view_index
                 primitive.attributes[attribute].name = f'{mesh.name}_vertices#0_{attribute}'
 
             #
             # Gather indices
             #
 
-            all_indices = [] # Use a regular python list as appending is faster than using numpy
-
             # Add max index to the indices (this makes sure that meshes with more than one primitive render correctly)
-            max_index = 0
-            for primitive in mesh.primitives:
-                indices = primitive.indices.buffer_view
-                indices = np.array([x + max_index for x in indices])
-                max_index = max(indices) + 1
-
-                # Reverse indices (this makes the faces render in the correct direction)
-                for i in range(0, len(indices), 3):
-                    all_indices.append(indices[i + 2])
-                    all_indices.append(indices[i + 1])
-                    all_indices.append(indices[i + 0])
+            # and reverse them (this makes the faces render in the correct direction)
+            all_indices = merge_indices([mesh_primitive.indices.buffer_view for mesh_primitive in mesh.primitives])
+            all_indices = rewind_indices(all_indices)
 
             primitive = mesh.primitives[0] # use first primitive
             indices_accessor = primitive.indices
 
-            # Convert to numpy array
+            # Convert to the data type of the accessor
             dtype = gltf2_io_constants.ComponentType.to_numpy_dtype_asobo(indices_accessor.component_type)
-            all_indices = np.array(all_indices, dtype=dtype)
-
-            # Set binary data and append to buffer view
-            binary_data = gltf2_io_binary_data.BinaryData(all_indices.tobytes())
-            offset = self.BufferViewIndex.buffer.append_data(binary_data, check_padding=True, calculate_offset=True)
-            if self.BufferViewIndex not in self.BufferViews:
-                    self.BufferViews.append(self.BufferViewIndex)
+            all_indices = all_indices.astype(dtype)
 
-            indices_accessor.buffer_view = self.BufferViews.index(self.BufferViewIndex)
+            # Append to buffer view
+            offset = self.BufferViewIndex.buffer.append_bytes(all_indices, check_padding=True, calculate_offset=True)
+            indices_accessor.buffer_view = self.__get_buffer_view_index(self.BufferViewIndex)
             if offset != 0:
                 indices_accessor.byte_offset = offset
             indices_accessor.count = len(all_indices)
@@ -427,7 +437,7 @@ class AsoboBufferViews():
             # Distribute the shared accessors between all the primitives
             #
 
-            total_asobo_primitive_count = 0
+            start_indices = get_start_indices([mesh_primitive.extras['ASOBO_primitive']['PrimitiveCount'] for mesh_primitive in mesh.primitives])
             for pidx, mesh_primitive in enumerate(mesh.primitives):
                 for attribute in mesh_primitive.attributes:
                     mesh_primitive.attributes[attribute] = primitive.attributes[attribute]
@@ -435,5 +445,4 @@ class AsoboBufferViews():
 
                 # Set StartIndex
                 if pidx > 0:
-                    mesh_primitive.extras['ASOBO_primitive']['StartIndex'] = total_asobo_primitive_count * 3
-                total_asobo_primitive_count += mesh_primitive.extras['ASOBO_primitive']['PrimitiveCount']
+                    mesh_primitive.extras['ASOBO_primitive']['StartIndex'] = int(start_indices[pidx])
@@ -13,40 +13,47 @@
 # limitations under the License.
 
 import typing
-import array
-import struct
+import zlib
+import numpy as np
 from io_scene_gltf2_msfs.io.com import gltf2_io_constants
 
-STRUCT_HALF = struct.Struct('e')
 
 class BinaryData:
     """Store for gltf binary data that can later be stored in a buffer."""
 
-    def __init__(self, data: bytes):
-        if not isinstance(data, bytes):
+    def __init__(self, data: typing.Union[bytes, memoryview]):
+        if not isinstance(data, (bytes, memoryview)):
             raise TypeError("Data is not a bytes array")
+        if isinstance(data, memoryview) and not data.readonly:
+            raise TypeError("Data is not a read-only memoryview")
         self.data = data
 
     def __eq__(self, other):
         return self.data == other.data
 
     def __hash__(self):
-        return hash(self.data)
+        # memoryviews on NumPy arrays are not hashable, but the checksum works on any bytes-like data
+        return zlib.crc32(self.data)
 
     @classmethod
     def from_list(cls, lst: typing.List[typing.Any], gltf_component_type: gltf2_io_constants.ComponentType, emulate_asobo_optimization=False):
+        return cls.from_array(np.array(lst), gltf_component_type, emulate_asobo_optimization)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, gltf_component_type: gltf2_io_constants.ComponentType, emulate_asobo_optimization=False):
+        """
+        Create binary data from a NumPy array, cast to the little endian type of the component type.
+
+        No copy is made if the array already has that type. The data is a read-only view on the array.
+        """
         if emulate_asobo_optimization: # Since Asobo uses a different data type for a certain component, we need to check if that's the case
-            format_char = gltf2_io_constants.ComponentType.to_type_code_asobo(gltf_component_type)
-            if format_char == 'e':
-                # 2 byte float, not supported by array.array()
-                data = b''
-                for x in lst:
-                    data += STRUCT_HALF.pack(x)
-                return BinaryData(data)
+            dtype = gltf2_io_constants.ComponentType.to_numpy_dtype_asobo(gltf_component_type)
         else:
-            format_char = gltf2_io_constants.ComponentType.to_type_code(gltf_component_type)
+            dtype = gltf2_io_constants.ComponentType.to_numpy_dtype(gltf_component_type)
 
-        return BinaryData(array.array(format_char, lst).tobytes())
+        array = np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder('<')).reshape(-1).view()
+        array.flags.writeable = False
+        return BinaryData(memoryview(array).cast('B'))
 
     @property
     def byte_length(self):
@@ -18,23 +18,82 @@ from io_scene_gltf2_msfs.io.com import gltf2_io
 from io_scene_gltf2_msfs.io.exp import gltf2_io_binary_data
 
 
+class DataURI:
+    """
+    Base64 data URI of a list of binary chunks, used as 'uri' of embedded buffers.
+
+    The URI is never built as a single string: the JSON writer streams it block by block with iter_encoded.
+    """
+
+    # Multiple of 3, so that each block encodes without base64 padding
+    BLOCK_SIZE = 3 * 256 * 1024
+
+    def __init__(self, chunks, mime_type='application/octet-stream'):
+        self.chunks = chunks
+        self.mime_type = mime_type
+
+    def iter_encoded(self):
+        """Yield the URI as ASCII strings."""
+        yield 'data:' + self.mime_type + ';base64,'
+
+        pending = b''
+        for chunk in self.chunks:
+            view = memoryview(chunk).cast('B')
+            start = 0
+            if pending:
+                # complete the bytes left over from the previous chunk to a group of 3
+                start = min(3 - len(pending), len(view))
+                pending += view[:start].tobytes()
+                if len(pending) < 3:
+                    continue
+                yield base64.b64encode(pending).decode('ascii')
+                pending = b''
+
+            end = len(view) - (len(view) - start) % 3
+            for offset in range(start, end, self.BLOCK_SIZE):
+                yield base64.b64encode(view[offset:min(offset + self.BLOCK_SIZE, end)]).decode('ascii')
+            pending = view[end:].tobytes()
+
+        if pending:
+            yield base64.b64encode(pending).decode('ascii')
+
+    def __str__(self):
+        return ''.join(self.iter_encoded())
+
+
 class Buffer:
-    """Class representing binary data for use in a glTF file as 'buffer' property."""
+    """
+    Class representing binary data for use in a glTF file as 'buffer' property.
+
+    The data is kept as a list of chunks (bytes-like objects) that are only joined or written out
+    when the buffer is finalized, so adding data never copies what is already in the buffer.
+    """
 
     def __init__(self, buffer_index=0):
-        self.__data = bytearray(b"")
+        self.__chunks = []
+        self.__byte_length = 0
         self.__buffer_index = buffer_index
 
+    def __append(self, data):
+        view = memoryview(data).cast('B')
+        if len(view) > 0:
+            self.__chunks.append(view)
+            self.__byte_length += len(view)
+
+    def __pad(self):
+        # offsets should be a multiple of 4 --> therefore add padding if necessary
+        padding = (4 - (self.__byte_length % 4)) % 4
+        if padding != 0:
+            self.__append(b"\x00" * padding)
+
     def add_and_get_view(self, binary_data: gltf2_io_binary_data.BinaryData) -> gltf2_io.BufferView:
         """Add binary data to the buffer. Return a glTF BufferView."""
-        offset = len(self.__data)
-        self.__data.extend(binary_data.data)
+        offset = self.__byte_length
+        self.__append(binary_data.data)
 
         length = binary_data.byte_length
 
-        # offsets should be a multiple of 4 --> therefore add padding if necessary
-        padding = (4 - (length % 4)) % 4
-        self.__data.extend(b"\x00" * padding)
+        self.__pad()
 
         buffer_view = gltf2_io.BufferView(
             buffer=self.__buffer_index,
@@ -48,26 +107,42 @@ class Buffer:
         )
         return buffer_view
 
-    def add(self, data) -> gltf2_io.BufferView:
-        """Add binary data to the buffer."""
-        offset = len(self.__data)
-        self.__data += data
+    def add(self, data) -> int:
+        """Add binary data to the buffer. Return its offset."""
+        offset = self.__byte_length
+        self.__append(data)
+        self.__pad()
 
-        # offsets should be a multiple of 4 --> therefore add padding if necessary
-        padding = (4 - (len(data) % 4)) % 4
-        self.__data += b"\x00" * padding
+        return offset
+
+    def add_chunks(self, chunks) -> int:
+        """Add a sequence of bytes-like chunks to the buffer without copying them. Return the offset of the first one."""
+        offset = self.__byte_length
+        for chunk in chunks:
+            self.__append(chunk)
+        self.__pad()
 
         return offset
 
     @property
     def byte_length(self):
-        return len(self.__data)
+        return self.__byte_length
+
+    @property
+    def chunks(self):
+        return self.__chunks
+
+    def write_to(self, file):
+        """Write the buffer chunk by chunk to a binary file object."""
+        for chunk in self.__chunks:
+            file.write(chunk)
 
     def to_bytes(self):
-        return self.__data
+        return b"".join(self.__chunks)
 
-    def to_embed_string(self):
-        return 'data:application/octet-stream;base64,' + base64.b64encode(self.__data).decode('ascii')
+    def to_data_uri(self):
+        return DataURI(self.__chunks)
 
     def clear(self):
-        self.__data = b""
+        self.__chunks = []
+        self.__byte_length = 0
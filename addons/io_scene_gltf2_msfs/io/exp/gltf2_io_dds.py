@@ -0,0 +1,190 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors, FlyByWire Simulations.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+
+import numpy as np
+
+from io_scene_gltf2_msfs.io.exp.gltf2_io_image_resample import mip_chain
+
+DDS_MAGIC = b'DDS '
+
+# Block compression formats
+BC1 = 'BC1'  # RGB, 8 bytes per block
+BC3 = 'BC3'  # RGBA, 16 bytes per block
+BC5 = 'BC5'  # RG, 16 bytes per block
+
+FOURCC = {
+    BC1: b'DXT1',
+    BC3: b'DXT5',
+    BC5: b'ATI2',
+}
+
+BLOCK_SIZE = {
+    BC1: 8,
+    BC3: 16,
+    BC5: 16,
+}
+
+# DDS_HEADER flags
+DDSD_CAPS = 0x1
+DDSD_HEIGHT = 0x2
+DDSD_WIDTH = 0x4
+DDSD_PIXELFORMAT = 0x1000
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_LINEARSIZE = 0x80000
+DDPF_FOURCC = 0x4
+DDSCAPS_COMPLEX = 0x8
+DDSCAPS_TEXTURE = 0x1000
+DDSCAPS_MIPMAP = 0x400000
+
+# Rows of blocks compressed at once, to bound the memory used on large images
+BLOCK_ROWS_PER_BAND = 64
+
+
+def encode_dds(pixels: np.ndarray, compression: str, mipmaps: bool = True) -> bytes:
+    """
+    Encode an image as a block compressed DDS texture without external tools.
+
+    :param pixels: (height, width, 4) uint8 RGBA array, top row first. BC1 ignores alpha, BC5 only keeps red and green.
+    :param compression: BC1, BC3 or BC5
+    :param mipmaps: whether to write the full mip chain, down to 1x1
+    :return: the DDS file data
+    """
+    height, width, _ = pixels.shape
+    levels = mip_chain(pixels) if mipmaps else [pixels]
+
+    data = [_header(width, height, len(levels), compression)]
+    for level in levels:
+        data.extend(_compress(level, compression))
+    return b''.join(data)
+
+
+def _header(width: int, height: int, mip_count: int, compression: str) -> bytes:
+    flags = DDSD_CAPS | DDSD_HEIGHT | DDSD_WIDTH | DDSD_PIXELFORMAT | DDSD_LINEARSIZE
+    caps = DDSCAPS_TEXTURE
+    if mip_count > 1:
+        flags |= DDSD_MIPMAPCOUNT
+        caps |= DDSCAPS_COMPLEX | DDSCAPS_MIPMAP
+    linear_size = max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * BLOCK_SIZE[compression]
+
+    pixel_format = struct.pack('<II4s5I', 32, DDPF_FOURCC, FOURCC[compression], 0, 0, 0, 0, 0)
+    header = struct.pack('<7I44x', 124, flags, height, width, linear_size, 0, mip_count) + pixel_format + \
+        struct.pack('<4I4x', caps, 0, 0, 0)
+    return DDS_MAGIC + header
+
+
+def _compress(pixels: np.ndarray, compression: str):
+    """Yield the compressed blocks of an image, in bands of block rows."""
+    height, width, _ = pixels.shape
+    # Blocks are 4x4 pixels; partial blocks at the edges repeat the last row or column
+    pixels = np.pad(pixels, ((0, -height % 4), (0, -width % 4), (0, 0)), mode='edge')
+    block_columns = pixels.shape[1] // 4
+
+    for start in range(0, pixels.shape[0], 4 * BLOCK_ROWS_PER_BAND):
+        band = pixels[start:start + 4 * BLOCK_ROWS_PER_BAND]
+        block_rows = band.shape[0] // 4
+        # (blocks, 16 pixels, channels), pixels of a block in row major order
+        blocks = band.reshape(block_rows, 4, block_columns, 4, 4).transpose(0, 2, 1, 3, 4).reshape(-1, 16, 4)
+
+        if compression == BC1:
+            yield _compress_color(blocks[:, :, :3]).tobytes()
+        elif compression == BC3:
+            yield np.concatenate((_compress_alpha(blocks[:, :, 3]), _compress_color(blocks[:, :, :3])), axis=1) \
+                .tobytes()
+        elif compression == BC5:
+            yield np.concatenate((_compress_alpha(blocks[:, :, 0]), _compress_alpha(blocks[:, :, 1])), axis=1) \
+                .tobytes()
+        else:
+            raise ValueError("Unsupported DDS compression {}".format(compression))
+
+
+def _compress_color(blocks: np.ndarray) -> np.ndarray:
+    """BC1 color blocks from (blocks, 16, 3) uint8 colors, as (blocks, 8) uint8."""
+    colors = blocks.astype(np.float32)
+
+    # Endpoints are the extremes of the colors along their principal axis, found by power iteration
+    mean = colors.mean(axis=1, keepdims=True)
+    centered = colors - mean
+    covariance = np.einsum('bpi,bpj->bij', centered, centered)
+    # Start from the covariance row of the channel that varies most. A fixed start vector fails on blocks whose
+    # colors only differ orthogonally to it, like red and green: (1, 1, 1) . (255, -255, 0) = 0.
+    rows = np.arange(len(colors))
+    axis = covariance[rows, np.einsum('bii->bi', covariance).argmax(axis=1)]
+    for _ in range(4):
+        axis = np.einsum('bij,bj->bi', covariance, axis)
+        axis /= np.maximum(np.abs(axis).max(axis=1, keepdims=True), 1e-12)
+    projection = np.einsum('bpi,bi->bp', centered, axis)
+    low = colors[rows, projection.argmin(axis=1)]
+    high = colors[rows, projection.argmax(axis=1)]
+
+    # Inset the endpoints a little, as the extremes are represented exactly by the quantized palette anyway
+    inset = (high - low) / 16
+    endpoint0 = _to_565(high - inset)
+    endpoint1 = _to_565(low + inset)
+
+    # The four color mode needs endpoint0 > endpoint1
+    swap = endpoint0 < endpoint1
+    endpoint0, endpoint1 = np.where(swap, endpoint1, endpoint0), np.where(swap, endpoint0, endpoint1)
+
+    color0 = _from_565(endpoint0)
+    color1 = _from_565(endpoint1)
+    palette = np.stack((color0, color1, (2 * color0 + color1) / 3, (color0 + 2 * color1) / 3), axis=1)
+    distances = ((colors[:, :, None, :] - palette[:, None, :, :]) ** 2).sum(axis=3)
+    indices = distances.argmin(axis=2).astype(np.uint32)
+    # Equal endpoints select the three color mode, in which only the first color is used
+    indices[endpoint0 == endpoint1] = 0
+
+    out = np.empty((len(colors), 8), np.uint8)
+    out[:, 0:2] = endpoint0.astype('<u2')[:, None].view(np.uint8)
+    out[:, 2:4] = endpoint1.astype('<u2')[:, None].view(np.uint8)
+    out[:, 4:8] = _pack_indices(indices, 2).astype('<u4')[:, None].view(np.uint8)
+    return out
+
+
+def _compress_alpha(blocks: np.ndarray) -> np.ndarray:
+    """BC4 blocks (the alpha of BC3, the channels of BC5) from (blocks, 16) uint8 values, as (blocks, 8) uint8."""
+    values = blocks.astype(np.int32)
+    # The eight value mode: endpoint0 > endpoint1, six values interpolated in between
+    endpoint0 = values.max(axis=1)
+    endpoint1 = values.min(axis=1)
+
+    weights = np.array([7, 0, 6, 5, 4, 3, 2, 1], np.int32)
+    palette = (weights * endpoint0[:, None] + (7 - weights) * endpoint1[:, None]) / 7
+    indices = np.abs(values[:, :, None] - palette[:, None, :]).argmin(axis=2).astype(np.uint64)
+    indices[endpoint0 == endpoint1] = 0
+
+    out = np.empty((len(values), 8), np.uint8)
+    out[:, 0] = endpoint0
+    out[:, 1] = endpoint1
+    out[:, 2:8] = _pack_indices(indices, 3).astype('<u8')[:, None].view(np.uint8)[:, :6]
+    return out
+
+
+def _pack_indices(indices: np.ndarray, bits: int) -> np.ndarray:
+    shifts = np.arange(16, dtype=indices.dtype) * indices.dtype.type(bits)
+    return np.bitwise_or.reduce(indices << shifts, axis=1)
+
+
+def _to_565(colors: np.ndarray) -> np.ndarray:
+    scale = np.array([31, 63, 31], np.float32) / 255
+    r, g, b = np.clip(np.rint(colors * scale), 0, [31, 63, 31]).astype(np.uint32).T
+    return (r << 11) | (g << 5) | b
+
+
+def _from_565(colors: np.ndarray) -> np.ndarray:
+    r = (colors >> 11) & 31
+    g = (colors >> 5) & 63
+    b = colors & 31
+    return np.stack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)), axis=1).astype(np.float32)
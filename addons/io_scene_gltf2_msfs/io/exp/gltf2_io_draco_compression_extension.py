@@ -12,19 +12,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from ctypes import *
 from pathlib import Path
 
+import numpy as np
+
 from io_scene_gltf2_msfs.io.exp.gltf2_io_binary_data import BinaryData
 from ...io.com.gltf2_io_debug import print_console
 from io_scene_gltf2_msfs.io.com.gltf2_io_draco_compression_extension import dll_path
 
+# the Draco library, loaded on first use and kept for the session
+_dll = None
+
 
 def encode_scene_primitives(scenes, export_settings):
     """
     Handles draco compression.
     Moves position, normal and texture coordinate attributes into a Draco encoded buffer.
+
+    All primitives are collected first, so that primitives of meshes used by several nodes are encoded once. They are
+    then encoded on a thread pool; the library calls release the GIL.
     """
+    dll = __load_dll()
+
+    primitives = []
+    seen = set()
+    for scene in scenes:
+        for node in scene.nodes:
+            __traverse_node(node, lambda node: __collect_node(node, primitives, seen))
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(lambda job: __encode_primitive(job, dll, export_settings), primitives))
+
+    for (primitive, _), result in zip(primitives, results):
+        if result is not None:
+            __apply_encoded_primitive(primitive, result)
+
+
+def __load_dll():
+    global _dll
+    if _dll is not None:
+        return _dll
 
     # Load DLL and setup function signatures.
     dll = cdll.LoadLibrary(str(dll_path().resolve()))
@@ -62,9 +92,8 @@ def encode_scene_primitives(scenes, export_settings):
     dll.encoderCopy.restype = None
     dll.encoderCopy.argtypes = [c_void_p, c_void_p]
 
-    for scene in scenes:
-        for node in scene.nodes:
-            __traverse_node(node, lambda node: __encode_node(node, dll, export_settings))
+    _dll = dll
+    return _dll
 
 
 def __traverse_node(node, f):
@@ -74,42 +103,65 @@ def __traverse_node(node, f):
             __traverse_node(child, f)
 
 
-def __encode_node(node, dll, export_settings):
-    if not (node.mesh is None):
-        print_console('INFO', 'Draco encoder: Encoding mesh {}.'.format(node.name))
-        for primitive in node.mesh.primitives:
-            __encode_primitive(primitive, dll, export_settings)
+def __collect_node(node, primitives, seen):
+    if node.mesh is None or id(node.mesh) in seen:
+        return
+    seen.add(id(node.mesh))
+
+    print_console('INFO', 'Draco encoder: Encoding mesh {}.'.format(node.name))
+    for primitive in node.mesh.primitives:
+        if id(primitive) in seen:
+            continue
+        seen.add(id(primitive))
 
+        job = __gather_primitive_data(primitive, seen)
+        if job is not None:
+            primitives.append((primitive, job))
 
-def __encode_primitive(primitive, dll, export_settings):
+
+def __gather_primitive_data(primitive, seen):
+    """Collect what the encoder needs from a primitive, or None if it is not encoded."""
     attributes = primitive.attributes
     indices = primitive.indices
 
     # Only do TRIANGLES primitives
     if primitive.mode not in [None, 4]:
-        return
+        return None
 
     if 'POSITION' not in attributes:
         print_console('WARNING', 'Draco encoder: Primitive without positions encountered. Skipping.')
-        return
-
-    positions = attributes['POSITION']
+        return None
 
     # Skip nodes without a position buffer, e.g. a primitive from a Blender shared instance.
-    if attributes['POSITION'].buffer_view is None:
-        return
+    # Positions already collected for another primitive will have lost their buffer to its Draco data as well.
+    if attributes['POSITION'].buffer_view is None or id(attributes['POSITION']) in seen:
+        return None
+    seen.add(id(attributes['POSITION']))
+
+    return {
+        'vertex_count': attributes['POSITION'].count,
+        'attributes': [
+            (attr_name, attr.component_type, attr.type, attr.buffer_view.data)
+            for attr_name, attr in attributes.items()
+        ],
+        'indices': (indices.component_type, indices.count, indices.buffer_view.data),
+        'has_targets': primitive.targets is not None and len(primitive.targets) > 0,
+    }
+
 
-    encoder = dll.encoderCreate(positions.count)
+def __encode_primitive(job, dll, export_settings):
+    # Runs on a worker thread: only works on the data gathered before, the primitive is updated afterwards
+    primitive, data = job
+    encoder = dll.encoderCreate(data['vertex_count'])
 
     draco_ids = {}
-    for attr_name in attributes:
-        attr = attributes[attr_name]
-        draco_id = dll.encoderSetAttribute(encoder, attr_name.encode(), attr.component_type, attr.type.encode(), attr.buffer_view.data)
+    for attr_name, component_type, attr_type, attr_data in data['attributes']:
+        draco_id = dll.encoderSetAttribute(encoder, attr_name.encode(), component_type, attr_type.encode(),
+                                           __address(attr_data))
         draco_ids[attr_name] = draco_id
-        attr.buffer_view = None
 
-    dll.encoderSetIndices(encoder, indices.component_type, indices.count, indices.buffer_view.data)
-    indices.buffer_view = None
+    component_type, count, indices_data = data['indices']
+    dll.encoderSetIndices(encoder, component_type, count, __address(indices_data))
 
     dll.encoderSetCompressionLevel(encoder, export_settings['gltf_draco_mesh_compression_level'])
     dll.encoderSetQuantizationBits(encoder,
@@ -119,28 +171,51 @@ def __encode_primitive(primitive, dll, export_settings):
         export_settings['gltf_draco_color_quantization'],
         export_settings['gltf_draco_generic_quantization'])
 
-    if not dll.encoderEncode(encoder, primitive.targets is not None and len(primitive.targets) > 0):
+    if not dll.encoderEncode(encoder, data['has_targets']):
         print_console('ERROR', 'Could not encode primitive. Skipping primitive.')
 
     byte_length = dll.encoderGetByteLength(encoder)
     encoded_data = bytes(byte_length)
     dll.encoderCopy(encoder, encoded_data)
 
+    result = {
+        'data': encoded_data,
+        'draco_ids': draco_ids,
+        'index_count': dll.encoderGetEncodedIndexCount(encoder),
+        'vertex_count': dll.encoderGetEncodedVertexCount(encoder),
+    }
+
+    dll.encoderRelease(encoder)
+    return result
+
+
+def __apply_encoded_primitive(primitive, result):
+    attributes = primitive.attributes
+    indices = primitive.indices
+
+    for attr_name in attributes:
+        attributes[attr_name].buffer_view = None
+    indices.buffer_view = None
+
     if primitive.extensions is None:
         primitive.extensions = {}
 
     primitive.extensions['KHR_draco_mesh_compression'] = {
-        'bufferView': BinaryData(encoded_data),
-        'attributes': draco_ids
+        'bufferView': BinaryData(result['data']),
+        'attributes': result['draco_ids']
     }
 
     # Set to triangle list mode.
     primitive.mode = 4
 
     # Update accessors to match encoded data.
-    indices.count = dll.encoderGetEncodedIndexCount(encoder)
-    encoded_vertices = dll.encoderGetEncodedVertexCount(encoder)
+    indices.count = result['index_count']
     for attr_name in attributes:
-        attributes[attr_name].count = encoded_vertices
+        attributes[attr_name].count = result['vertex_count']
 
-    dll.encoderRelease(encoder)
+
+def __address(data):
+    # BinaryData may hold a read-only memoryview of a NumPy array, which ctypes can't pass as a pointer
+    if isinstance(data, bytes):
+        return data
+    return np.frombuffer(data, np.uint8).ctypes.data
@@ -16,17 +16,47 @@
 # Imports
 #
 
-import json
+import io
+import os
 import struct
+from json.encoder import encode_basestring_ascii, INFINITY
+
+from io_scene_gltf2_msfs.io.com.gltf2_io import Gltf
+from io_scene_gltf2_msfs.io.com.gltf2_io_schema import get_json_fields
+from io_scene_gltf2_msfs.io.exp.gltf2_io_buffer import DataURI
 
 #
 # Globals
 #
 
+SORT_ORDER = [
+    "accessors",
+    "animations",
+    "asset",
+    "bufferViews",
+    "extensionsUsed",
+    "extensionsRequired",
+    "extensions",
+    "extras",
+    "materials",
+    "meshes",
+    "nodes",
+    "scene",
+    "scenes",
+    "skins",
+    "textures",
+    "buffers",
+    "images",
+    "cameras",
+    "samplers",
+]
+
+# Keys whose value is written even if it is an empty collection
+ALLOWED_EMPTY_COLLECTIONS = ["KHR_materials_unlit"]
+
 #
 # Functions
 #
-from collections import OrderedDict
 
 
 def save_gltf(gltf, export_settings, encoder, glb_buffer):
@@ -38,55 +68,32 @@ def save_gltf(gltf, export_settings, encoder, glb_buffer):
         # The comma is typically followed by a newline, so no trailing whitespace is needed on it.
         separators = (',', ': ')
 
-    sort_order = [
-        "accessors",
-        "animations",
-        "asset",
-        "bufferViews",
-        "extensionsUsed",
-        "extensionsRequired",
-        "extensions",
-        "extras",
-        "materials",
-        "meshes",
-        "nodes",
-        "scene",
-        "scenes",
-        "skins",
-        "textures",
-        "buffers",
-        "images",
-        "cameras",
-        "samplers",
-    ]
-    gltf_ordered = OrderedDict(sorted(gltf.items(), key=lambda item: sort_order.index(item[0])))
-    gltf_encoded = json.dumps(gltf_ordered, indent=indent, separators=separators, cls=encoder, allow_nan=False)
-
-    #
-
     if export_settings['gltf_format'] != 'GLB':
         file = open(export_settings['gltf_filepath'], "w", encoding="utf8", newline="\n")
-        file.write(gltf_encoded)
-        file.write("\n")
-        file.close()
-
-        binary = export_settings['gltf_binary']
-        if len(binary) > 0 and not export_settings['gltf_embed_buffers']:
-            file = open(export_settings['gltf_filedirectory'] + export_settings['gltf_binaryfilename'], "wb")
-            file.write(binary)
+        try:
+            _JSONWriter(file.write, encoder, indent, separators).write_gltf(gltf)
+            file.write("\n")
+        except (TypeError, ValueError):
+            # Values are only checked while they are written, do not leave a truncated file behind
             file.close()
+            os.remove(export_settings['gltf_filepath'])
+            raise
+        file.close()
 
     else:
+        json_chunk = io.BytesIO()
+        _JSONWriter(lambda text: json_chunk.write(text.encode()), encoder, indent, separators).write_gltf(gltf)
+
         file = open(export_settings['gltf_filepath'], "wb")
 
-        gltf_data = gltf_encoded.encode()
-        binary = glb_buffer
+        gltf_data = json_chunk.getbuffer()
 
         length_gltf = len(gltf_data)
         spaces_gltf = (4 - (length_gltf & 3)) & 3
         length_gltf += spaces_gltf
 
-        length_bin = len(binary)
+        # The BIN chunk is streamed from the chunks of the buffer, so its data is never joined in memory
+        length_bin = glb_buffer.byte_length if glb_buffer is not None else 0
         zeros_bin = (4 - (length_bin & 3)) & 3
         length_bin += zeros_bin
 
@@ -109,9 +116,155 @@ def save_gltf(gltf, export_settings, encoder, glb_buffer):
         if length_bin > 0:
             file.write(struct.pack("I", length_bin))
             file.write('BIN\0'.encode())
-            file.write(binary)
+            glb_buffer.write_to(file)
             file.write(b'\0' * zeros_bin)
 
         file.close()
 
     return True
+
+
+class _JSONWriter:
+    """
+    Write a gltf2_io.Gltf as JSON in a single pass over the glTF properties.
+
+    Unset values and empty collections are left out and integral floats are written as integers, to prevent
+    INTEGER_WRITTEN_AS_FLOAT validator warnings. The output is the same as json.dumps on the pruned to_dict() tree,
+    with the root properties ordered by SORT_ORDER.
+    """
+
+    FLUSH_SIZE = 4096
+
+    def __init__(self, write, encoder, indent, separators):
+        self.__write = write
+        self.__parts = []
+        self.__indent = None if indent is None else ' ' * indent
+        self.__item_separator, self.__key_separator = separators
+        # Values that are not pruned (tuples, objects handled by encoder.default) are written as is
+        self.__encoder = encoder(indent=indent, separators=separators, allow_nan=False)
+
+    def write_gltf(self, gltf: Gltf):
+        fields = sorted(get_json_fields(Gltf), key=lambda field: SORT_ORDER.index(field[0]))
+        self.__write_object(gltf, fields, 0)
+        self.__flush()
+
+    def __flush(self):
+        self.__write(''.join(self.__parts))
+        self.__parts.clear()
+
+    def __newline(self, level):
+        if self.__indent is None:
+            return ''
+        return '\n' + self.__indent * level
+
+    def __write_value(self, value, level):
+        parts = self.__parts
+        if isinstance(value, str):
+            parts.append(encode_basestring_ascii(value))
+        elif value is None:
+            parts.append('null')
+        elif value is True:
+            parts.append('true')
+        elif value is False:
+            parts.append('false')
+        elif isinstance(value, int):
+            parts.append(int.__repr__(value))
+        elif isinstance(value, float):
+            parts.append(self.__float_repr(value))
+        elif isinstance(value, list):
+            self.__write_list(value, level)
+        elif isinstance(value, dict):
+            self.__write_object(value, None, level)
+        elif isinstance(value, DataURI):
+            self.__write_data_uri(value)
+        else:
+            fields = get_json_fields(type(value))
+            if fields is not None:
+                self.__write_object(value, fields, level)
+            elif hasattr(value, 'to_list') or hasattr(value, 'to_dict'):
+                self.__write_value(self.__convert(value), level)
+            else:
+                text = self.__encoder.encode(value)
+                if self.__indent is not None:
+                    text = text.replace('\n', self.__newline(level))
+                parts.append(text)
+
+        if len(parts) > self.FLUSH_SIZE:
+            self.__flush()
+
+    def __write_data_uri(self, value: DataURI):
+        # Base64 needs no escaping, so the blocks are written straight to the output
+        self.__parts.append('"')
+        self.__flush()
+        for text in value.iter_encoded():
+            self.__write(text)
+        self.__parts.append('"')
+
+    @staticmethod
+    def __float_repr(value):
+        if value.is_integer():
+            return int.__repr__(int(value))
+        if value != value or value == INFINITY or value == -INFINITY:
+            raise ValueError("Out of range float values are not JSON compliant: " + repr(value))
+        return float.__repr__(value)
+
+    @staticmethod
+    def __convert(value):
+        # Same conversion as gltf2_io.extension_to_dict, applied lazily
+        if hasattr(value, 'to_list'):
+            value = value.to_list()
+        if hasattr(value, 'to_dict') and get_json_fields(type(value)) is None:
+            value = value.to_dict()
+        return value
+
+    @staticmethod
+    def __should_include(key, value):
+        if value is None:
+            return False
+        if isinstance(value, (dict, list)) and len(value) == 0 and key not in ALLOWED_EMPTY_COLLECTIONS:
+            return False
+        return True
+
+    def __write_object(self, value, fields, level):
+        """Write a dict, or a glTF property if fields are given, leaving out unset and empty values."""
+        if fields is None:
+            items = value.items()
+        else:
+            items = ((key, getattr(value, attribute)) for key, attribute in fields)
+
+        parts = self.__parts
+        newline = self.__newline(level + 1)
+        first = True
+        for key, item in items:
+            if not isinstance(item, (str, int, float, list, dict)) and item is not None:
+                item = self.__convert(item)
+            if not self.__should_include(key, item):
+                continue
+            if first:
+                parts.append('{' + newline)
+                first = False
+            else:
+                parts.append(self.__item_separator + newline)
+            parts.append(encode_basestring_ascii(key))
+            parts.append(self.__key_separator)
+            self.__write_value(item, level + 1)
+
+        if first:
+            parts.append('{}')
+        else:
+            parts.append(self.__newline(level) + '}')
+
+    def __write_list(self, value, level):
+        parts = self.__parts
+        if not value:
+            parts.append('[]')
+            return
+
+        newline = self.__newline(level + 1)
+        parts.append('[' + newline)
+        separator = self.__item_separator + newline
+        for index, item in enumerate(value):
+            if index > 0:
+                parts.append(separator)
+            self.__write_value(item, level + 1)
+        parts.append(self.__newline(level) + ']')
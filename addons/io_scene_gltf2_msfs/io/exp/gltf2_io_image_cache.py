@@ -0,0 +1,169 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors, FlyByWire Simulations.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+from io_scene_gltf2_msfs.io.com.gltf2_io_debug import print_console
+
+# Bump when the encoded output for the same key can change, to invalidate existing entries
+CACHE_VERSION = 2
+
+# File in the cache directory remembering the content hashes of source files across exports
+FILE_HASHES_NAME = 'file_hashes.json'
+
+
+class ImageCache:
+    """
+    On-disk cache of encoded export images, keyed by a hash of everything the encoded bytes depend on.
+
+    Entries are plain files named after their key. Reading an entry updates its modification time, which is used to
+    evict the least recently used entries once the cache grows over max_size bytes. Entries may be read and stored from
+    several threads at once; eviction should be done once nothing is encoding anymore.
+
+    The content hashes of source files are kept in an index file next to the entries, so that unchanged files aren't
+    read again on the next export.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.stored_bytes = 0
+        self.evicted = 0
+        self.__lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.__file_hashes = self.__load_file_hashes()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Make a key from strings or bytes-like parts."""
+        h = hashlib.sha256(str(CACHE_VERSION).encode())
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode()
+            h.update(len(part).to_bytes(8, 'little'))
+            h.update(part)
+        return h.hexdigest()
+
+    def file_hash(self, path: str) -> str:
+        """Content hash of a file, remembered as long as its size and modification time don't change."""
+        stat = os.stat(path)
+        known = self.__file_hashes.get(path)
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        file_hash = h.hexdigest()
+        self.__file_hashes[path] = [stat.st_size, stat.st_mtime_ns, file_hash]
+        return file_hash
+
+    def __load_file_hashes(self) -> dict:
+        try:
+            with open(self.__path(FILE_HASHES_NAME), 'r') as f:
+                file_hashes = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(file_hashes, dict) or file_hashes.get('version') != CACHE_VERSION:
+            return {}
+        return file_hashes.get('files', {})
+
+    def save_file_hashes(self):
+        """Write the file hashes to the index file, forgetting files that don't exist anymore."""
+        files = {path: known for path, known in self.__file_hashes.items() if os.path.isfile(path)}
+        path = self.__path(FILE_HASHES_NAME)
+        tmp_path = path + '.' + uuid.uuid4().hex + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'files': files}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print_console('WARNING', 'Could not store image cache file hashes: {}'.format(e))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def contains(self, key: str) -> bool:
+        """Look up a key, counting the hit or miss."""
+        found = os.path.isfile(self.__path(key))
+        with self.__lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def read(self, key: str) -> bytes:
+        path = self.__path(key)
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.utime(path)
+        return data
+
+    def store(self, key: str, data: bytes) -> bytes:
+        """Store the data of a key and return it."""
+        path = self.__path(key)
+        # write to a unique temp file first, so that readers never see a partial entry
+        tmp_path = path + '.' + uuid.uuid4().hex + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print_console('WARNING', 'Could not store image in cache: {}'.format(e))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return data
+
+        with self.__lock:
+            self.stored_bytes += len(data)
+        return data
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits in max_size, and save the file hashes."""
+        entries = []
+        total_size = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.endswith('.tmp') or entry.name == FILE_HASHES_NAME:
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            self.evicted += 1
+
+        self.save_file_hashes()
+
+    def report_statistics(self):
+        print_console('INFO', 'Image cache: {} hits, {} misses, {:.1f} MB stored, {} entries evicted'.format(
+            self.hits, self.misses, self.stored_bytes / (1024 * 1024), self.evicted))
@@ -11,24 +11,27 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
 import re
+import typing
 
 
 class ImageData:
-    """Contains encoded images"""
+    """
+    Contains encoded images
+
+    ImageData objects compare by identity, comparing them must not force the encoding. Use digest to compare the
+    encoded images.
+    """
     # FUTURE_WORK: as a method to allow the node graph to be better supported, we could model some of
     # the node graph elements with numpy functions
 
-    def __init__(self, data: bytes, mime_type: str, name: str):
+    def __init__(self, data: typing.Union[bytes, typing.Callable[[], bytes]], mime_type: str, name: str):
+        """The data is either the encoded image or a function encoding it, called when the data is first needed."""
         self._data = data
         self._mime_type = mime_type
         self._name = name
-
-    def __eq__(self, other):
-        return self._data == other.data
-
-    def __hash__(self):
-        return hash(self._data)
+        self._digest = None
 
     def adjusted_name(self):
         regex_dot = re.compile("\.")
@@ -38,8 +41,17 @@ class ImageData:
 
     @property
     def data(self):
+        if callable(self._data):
+            self._data = self._data()
         return self._data
 
+    @property
+    def digest(self) -> bytes:
+        """Hash of the encoded image, computed once."""
+        if self._digest is None:
+            self._digest = hashlib.blake2b(self.data, digest_size=16).digest()
+        return self._digest
+
     @property
     def name(self):
         return self._name
@@ -48,8 +60,10 @@ class ImageData:
     def file_extension(self):
         if self._mime_type == "image/jpeg":
             return ".jpg"
+        if self._mime_type == "image/vnd-ms.dds":
+            return ".dds"
         return ".png"
 
     @property
     def byte_length(self):
-        return len(self._data)
+        return len(self.data)
@@ -0,0 +1,86 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors, FlyByWire Simulations.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import typing
+
+import numpy as np
+
+
+def fit_size(width: int, height: int, max_size: int) -> typing.Tuple[int, int]:
+    """The size of an image scaled down to fit max_size, keeping the aspect ratio. A max_size of 0 is no limit."""
+    if max_size <= 0 or max(width, height) <= max_size:
+        return width, height
+    factor = max_size / max(width, height)
+    return max(1, round(width * factor)), max(1, round(height * factor))
+
+
+def resize(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Scale a (height, width, channels) image down with a box filter.
+
+    The image is halved as long as that doesn't go below the new size, then the rest is done in one area weighted
+    step. Integer images are rounded back to their type.
+    """
+    while pixels.shape[0] // 2 >= height and pixels.shape[1] // 2 >= width and pixels.shape[0] * pixels.shape[1] > 1:
+        pixels = downsample(pixels)
+    if pixels.shape[0] != height:
+        pixels = _resize_axis(pixels, 0, height)
+    if pixels.shape[1] != width:
+        pixels = _resize_axis(pixels, 1, width)
+    return pixels
+
+
+def downsample(pixels: np.ndarray) -> np.ndarray:
+    """Halve an image with a box filter. Sizes are rounded down like mip sizes, so odd sizes drop their last row or
+    column."""
+    height, width, channels = pixels.shape
+    rows = min(2, height)
+    columns = min(2, width)
+    pixels = pixels[:height // rows * rows, :width // columns * columns]
+
+    blocks = pixels.reshape(height // rows, rows, width // columns, columns, channels)
+    if np.issubdtype(pixels.dtype, np.integer):
+        count = rows * columns
+        return ((blocks.sum(axis=(1, 3), dtype=np.uint32) + count // 2) // count).astype(pixels.dtype)
+    return blocks.mean(axis=(1, 3), dtype=np.float32).astype(pixels.dtype)
+
+
+def mip_chain(pixels: np.ndarray) -> typing.List[np.ndarray]:
+    """An image followed by all its mip levels, down to 1x1."""
+    levels = [pixels]
+    while levels[-1].shape[0] > 1 or levels[-1].shape[1] > 1:
+        levels.append(downsample(levels[-1]))
+    return levels
+
+
+def _resize_axis(pixels: np.ndarray, axis: int, size: int) -> np.ndarray:
+    # Each new pixel is the average of the old pixels it covers, weighted by how much it covers them
+    old_size = pixels.shape[axis]
+    scale = old_size / size
+    starts = np.arange(size) * scale
+    ends = starts + scale
+    taps = int(np.ceil(scale)) + 1
+    indices = np.floor(starts).astype(np.int64)[:, None] + np.arange(taps)
+    weights = np.clip(np.minimum(indices + 1, ends[:, None]) - np.maximum(indices, starts[:, None]), 0, None) / scale
+    indices = np.minimum(indices, old_size - 1)
+
+    shape = [1] * pixels.ndim
+    shape[axis] = size
+    result = np.zeros(pixels.shape[:axis] + (size,) + pixels.shape[axis + 1:], np.float32)
+    for tap in range(taps):
+        result += np.take(pixels, indices[:, tap], axis=axis) * weights[:, tap].astype(np.float32).reshape(shape)
+
+    if np.issubdtype(pixels.dtype, np.integer):
+        return np.rint(result).astype(pixels.dtype)
+    return result.astype(pixels.dtype)
@@ -0,0 +1,93 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors, FlyByWire Simulations.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# PNG color types
+COLOR_TYPE_RGB = 2
+COLOR_TYPE_RGBA = 6
+
+FILTER_PAETH = 4
+
+# Rows filtered and compressed at once, to bound the memory used by the filter on large images
+ROWS_PER_BAND = 256
+
+
+def encode_png(pixels: np.ndarray, compression: int = 6) -> bytes:
+    """
+    Encode an image as PNG without Blender.
+
+    :param pixels: (height, width, channels) array, top row first, with 3 (RGB) or 4 (RGBA) channels.
+    uint8 arrays are written with 8 bits per channel, uint16 arrays with 16 bits per channel.
+    :param compression: zlib compression level, 0-9
+    :return: the PNG file data
+    """
+    height, width, channels = pixels.shape
+    color_type = {3: COLOR_TYPE_RGB, 4: COLOR_TYPE_RGBA}[channels]
+    if pixels.dtype == np.uint16:
+        bit_depth = 16
+        rows = np.ascontiguousarray(pixels, dtype='>u2').view(np.uint8).reshape(height, width * channels * 2)
+    elif pixels.dtype == np.uint8:
+        bit_depth = 8
+        rows = np.ascontiguousarray(pixels).reshape(height, width * channels)
+    else:
+        raise TypeError("PNG pixels must be uint8 or uint16, not {}".format(pixels.dtype))
+    bytes_per_pixel = channels * bit_depth // 8
+
+    compressor = zlib.compressobj(compression)
+    idat = []
+    previous_row = np.zeros(rows.shape[1], np.uint8)
+    for start in range(0, height, ROWS_PER_BAND):
+        band = rows[start:start + ROWS_PER_BAND]
+        filtered = np.empty((band.shape[0], band.shape[1] + 1), np.uint8)
+        filtered[:, 0] = FILTER_PAETH
+        filtered[:, 1:] = _paeth_filter(band, previous_row, bytes_per_pixel)
+        idat.append(compressor.compress(filtered))
+        previous_row = band[-1]
+    idat.append(compressor.flush())
+
+    header = struct.pack('>IIBBBBB', width, height, bit_depth, color_type, 0, 0, 0)
+    return b''.join((
+        PNG_SIGNATURE,
+        _chunk(b'IHDR', header),
+        _chunk(b'IDAT', b''.join(idat)),
+        _chunk(b'IEND', b''),
+    ))
+
+
+def _paeth_filter(band: np.ndarray, previous_row: np.ndarray, bytes_per_pixel: int) -> np.ndarray:
+    # The Paeth predictor only depends on unfiltered bytes, so all rows of the band are filtered at once.
+    # a = left, b = up, c = up left
+    b = np.empty(band.shape, np.int16)
+    b[0] = previous_row
+    b[1:] = band[:-1]
+    a = np.zeros(band.shape, np.int16)
+    a[:, bytes_per_pixel:] = band[:, :-bytes_per_pixel]
+    c = np.zeros(band.shape, np.int16)
+    c[:, bytes_per_pixel:] = b[:, :-bytes_per_pixel]
+
+    pa = np.abs(b - c)
+    pb = np.abs(a - c)
+    pc = np.abs(a + b - 2 * c)
+    predictor = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+    return (band - predictor).astype(np.uint8)
+
+
+def _chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)))
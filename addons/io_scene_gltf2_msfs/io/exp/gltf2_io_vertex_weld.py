@@ -0,0 +1,60 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors, FlyByWire Simulations.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import typing
+
+import numpy as np
+
+FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+FNV_PRIME = np.uint64(0x100000001b3)
+
+
+def key_columns(values: np.ndarray, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Weld key columns of float values, as int64.
+
+    With a tolerance of 0 the key is the exact bit pattern of the float32 value, with -0.0 and 0.0 being the same.
+    Otherwise values are rounded to a multiple of the tolerance first, so that values closer than it share a key.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if tolerance > 0:
+        return np.floor(values / np.float64(tolerance) + 0.5).astype(np.int64)
+    return (values + np.float32(0)).view(np.uint32).astype(np.int64)
+
+
+def weld(keys: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the unique rows of a (rows, columns) integer key array.
+
+    Rows are hashed to a single 64 bit word and only the hashes are sorted, which is much cheaper than sorting wide
+    records. Should two different rows ever share a hash, the rows themselves are sorted instead.
+
+    :return: the index of the first occurrence of each unique row, in order of first occurrence, and for each row the
+    index of its unique row
+    """
+    hashes = np.full(len(keys), FNV_OFFSET, dtype=np.uint64)
+    for column in keys.T:
+        hashes ^= column.astype(np.uint64)
+        hashes *= FNV_PRIME
+
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    if not np.array_equal(keys[first[inverse]], keys):
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    # Number the unique rows in order of first occurrence, which keeps vertices in roughly the order of the mesh
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse]
@@ -0,0 +1,83 @@
+# Copyright 2018-2021 The Khronos Group Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Exports a box mesh used by a translated object and by a rotated, scaled and parented instance with the Asobo
+# optimization, and checks the ASOBO_asset_optimized bounding box: it is in world space (Y up), covers every
+# instance and doesn't contain the origin.
+
+import json
+import math
+import os
+import sys
+import tempfile
+
+import bpy
+
+
+def make_object(name, mesh, location, rotation=(0, 0, 0), scale=(1, 1, 1), parent=None):
+    blender_object = bpy.data.objects.new(name, mesh)
+    blender_object.location = location
+    blender_object.rotation_euler = rotation
+    blender_object.scale = scale
+    blender_object.parent = parent
+    bpy.context.scene.collection.objects.link(blender_object)
+    return blender_object
+
+
+try:
+    for blender_object in list(bpy.data.objects):
+        bpy.data.objects.remove(blender_object)
+
+    # Local bounds x, y, z in [1, 2]
+    mesh = bpy.data.meshes.new('Box')
+    corners = [(x, y, z) for x in (1, 2) for y in (1, 2) for z in (1, 2)]
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    mesh.from_pydata(corners, [], faces)
+    mesh.update()
+
+    # World bounds in Blender (Z up):
+    #   Translated: x in [11, 12], y in [1, 2], z in [1, 2]
+    #   Instance, scaled by 2, rotated 90 degrees about Z, then moved up by 5 by its parent:
+    #     x in [-4, -2], y in [2, 4], z in [7, 9]
+    translated = make_object('Translated', mesh, (10, 0, 0))
+    parent = bpy.data.objects.new('Parent', None)
+    parent.location = (0, 0, 5)
+    bpy.context.scene.collection.objects.link(parent)
+    make_object('Instance', mesh, (0, 0, 0), (0, 0, math.pi / 2), (2, 2, 2), parent)
+
+    # Y up: (x, z, -y)
+    expected_min = [-4, 1, -4]
+    expected_max = [12, 9, -1]
+
+    gltf_path = os.path.join(tempfile.mkdtemp(), 'bounding_box.gltf')
+    bpy.ops.export_scene.gltf_msfs(
+        export_format='GLTF_SEPARATE',
+        filepath=gltf_path,
+        emulate_asobo_optimization=True,
+    )
+    with open(gltf_path) as file:
+        asset = json.load(file)
+
+    meshes = {node['name']: node['mesh'] for node in asset['nodes'] if 'mesh' in node}
+    assert meshes.keys() == {'Translated', 'Instance'}, "unexpected mesh nodes {}".format(sorted(meshes))
+    assert meshes['Translated'] == meshes['Instance'], "the instance doesn't share the mesh"
+
+    extension = asset['asset']['extensions']['ASOBO_asset_optimized']
+    for key, expected in (('BoundingBoxMin', expected_min), ('BoundingBoxMax', expected_max)):
+        actual = extension[key]
+        assert len(actual) == 3 and all(abs(a - e) < 1e-5 for a, e in zip(actual, expected)), \
+            "{} is {} instead of {}".format(key, actual, expected)
+except Exception as err:
+    print(err, file=sys.stderr)
+    sys.exit(1)
@@ -0,0 +1,176 @@
+# Copyright 2018-2021 The Khronos Group Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Decodes the output of the DDS encoder and compares it with the source image and its mip levels.
+
+import struct
+import sys
+
+import numpy as np
+
+FOURCC = {b'DXT1': 'BC1', b'DXT5': 'BC3', b'ATI2': 'BC5'}
+BLOCK_SIZE = {'BC1': 8, 'BC3': 16, 'BC5': 16}
+
+
+def read_dds(data):
+    """The compression and the decoded (height, width, 4) float RGBA mip levels of a DDS file."""
+    assert data[:4] == b'DDS ', "bad magic"
+    size, flags, height, width, linear_size, _, mip_count = struct.unpack('<7I', data[4:32])
+    assert size == 124, "bad header size"
+    assert flags & 0x1007 == 0x1007, "missing caps/height/width/pixel format flags"
+    fourcc = data[84:88]
+    compression = FOURCC[fourcc]
+    caps, = struct.unpack('<I', data[108:112])
+    assert caps & 0x1000, "missing texture caps"
+    if mip_count > 1:
+        assert flags & 0x20000 and caps & 0x400008 == 0x400008, "missing mipmap flags"
+
+    levels = []
+    offset = 128
+    for level in range(max(mip_count, 1)):
+        columns = (width + 3) // 4
+        rows = (height + 3) // 4
+        length = columns * rows * BLOCK_SIZE[compression]
+        blocks = np.frombuffer(data, np.uint8, length, offset).reshape(-1, BLOCK_SIZE[compression])
+        offset += length
+        if compression == 'BC1':
+            decoded = decode_bc1(blocks)
+        elif compression == 'BC3':
+            # The color block of BC3 always uses the four color mode
+            decoded = decode_bc1(blocks[:, 8:], four_colors_only=True)
+            decoded[:, :, 3] = decode_bc4(blocks[:, :8])
+        else:
+            decoded = np.zeros((len(blocks), 16, 4))
+            decoded[:, :, 0] = decode_bc4(blocks[:, :8])
+            decoded[:, :, 1] = decode_bc4(blocks[:, 8:])
+            decoded[:, :, 3] = 255
+        image = decoded.reshape(rows, columns, 4, 4, 4).transpose(0, 2, 1, 3, 4).reshape(rows * 4, columns * 4, 4)
+        levels.append(image[:height, :width])
+        width = max(1, width // 2)
+        height = max(1, height // 2)
+    assert offset == len(data), "unexpected data after the last mip level"
+    return compression, levels
+
+
+def decode_bc1(blocks, four_colors_only=False):
+    color0, color1 = blocks[:, 0:4].copy().view('<u2').T.astype(np.int64)
+    indices = blocks[:, 4:8].copy().view('<u4')[:, 0].astype(np.int64)
+    palette = np.zeros((len(blocks), 4, 4))
+    palette[:, 0, :3] = expand_565(color0)
+    palette[:, 1, :3] = expand_565(color1)
+    four_colors = ((color0 > color1) | four_colors_only)[:, None]
+    palette[:, 2, :3] = np.where(four_colors, (2 * palette[:, 0, :3] + palette[:, 1, :3]) / 3,
+                                 (palette[:, 0, :3] + palette[:, 1, :3]) / 2)
+    palette[:, 3, :3] = np.where(four_colors, (palette[:, 0, :3] + 2 * palette[:, 1, :3]) / 3, 0)
+    palette[:, :, 3] = 255
+    palette[:, 3, 3] = np.where(four_colors[:, 0], 255, 0)
+    selectors = (indices[:, None] >> (2 * np.arange(16))) & 3
+    return np.take_along_axis(palette, selectors[:, :, None], axis=1)
+
+
+def expand_565(color):
+    r = (color >> 11) & 31
+    g = (color >> 5) & 63
+    b = color & 31
+    return np.stack((r * 255 / 31, g * 255 / 63, b * 255 / 31), axis=1)
+
+
+def decode_bc4(blocks):
+    value0 = blocks[:, 0].astype(np.float64)
+    value1 = blocks[:, 1].astype(np.float64)
+    indices = np.zeros(len(blocks), np.int64)
+    for i in range(6):
+        indices |= blocks[:, 2 + i].astype(np.int64) << (8 * i)
+    palette = np.zeros((len(blocks), 8))
+    palette[:, 0] = value0
+    palette[:, 1] = value1
+    eight_values = value0 > value1
+    for i in range(1, 7):
+        palette[:, i + 1] = ((7 - i) * value0 + i * value1) / 7
+    for i in range(1, 5):
+        palette[:, i + 1] = np.where(eight_values, palette[:, i + 1], ((5 - i) * value0 + i * value1) / 5)
+    palette[:, 6] = np.where(eight_values, palette[:, 6], 0)
+    palette[:, 7] = np.where(eight_values, palette[:, 7], 255)
+    selectors = (indices[:, None] >> (3 * np.arange(16))) & 7
+    return np.take_along_axis(palette, selectors, axis=1)
+
+
+def two_color_blocks(rng, height, width):
+    # Each block mixes two random colors: BC4 keeps them exactly, BC1 keeps them close
+    block_rows = (height + 3) // 4
+    block_columns = (width + 3) // 4
+    colors = rng.integers(0, 256, (2, block_rows, block_columns, 4), np.uint8).repeat(4, axis=1).repeat(4, axis=2)
+    mask = rng.integers(0, 2, (block_rows * 4, block_columns * 4, 1)).astype(bool)
+    return np.where(mask, colors[0], colors[1])[:height, :width]
+
+
+def gray_ramp(height, width):
+    # All colors of a block are on one line, which BC1 can represent well at every mip level
+    y, x = np.mgrid[0:height, 0:width]
+    values = (x * 64 // max(width - 1, 1) + y * 64 // max(height - 1, 1)).astype(np.uint8)
+    return np.stack((values, values, values, 255 - values), axis=2)
+
+
+try:
+    from io_scene_gltf2_msfs.io.exp import gltf2_io_dds
+    from io_scene_gltf2_msfs.io.exp.gltf2_io_image_resample import mip_chain
+
+    # Mip sizes are halved and rounded down, to 1x1
+    assert [level.shape[:2] for level in mip_chain(np.zeros((7, 13, 4), np.uint8))] == \
+        [(7, 13), (3, 6), (1, 3), (1, 1)], "bad mip sizes"
+    checker = np.zeros((4, 4, 4), np.uint8)
+    checker[::2, ::2] = 255
+    checker[1::2, 1::2] = 255
+    assert (mip_chain(checker)[1] == 128).all(), "mip levels must be the rounded 2x2 average"
+
+    # (compression, channels compared, max error on two color blocks, mean error on mip levels of the ramp)
+    formats = (
+        ('BC1', [0, 1, 2], 255 / 16 + 255 / 31, 12),
+        ('BC3', [0, 1, 2], 255 / 16 + 255 / 31, 12),
+        ('BC3', [3], 0, 6),
+        ('BC5', [0, 1], 0, 6),
+    )
+
+    rng = np.random.default_rng(0)
+    band = 4 * gltf2_io_dds.BLOCK_ROWS_PER_BAND
+    # Heights past a band check the bands are written in order, sizes that are not a multiple of 4 check the
+    # padding of partial blocks
+    for height, width in ((1, 1), (7, 13), (64, 64), (band + 6, 20)):
+        pixels = two_color_blocks(rng, height, width)
+        ramp = gray_ramp(height, width)
+        ramp_levels = mip_chain(ramp)
+        for compression, channels, block_tolerance, mip_tolerance in formats:
+            decoded_compression, (decoded, ) = read_dds(gltf2_io_dds.encode_dds(pixels, compression, mipmaps=False))
+            assert decoded_compression == compression, "bad FourCC for " + compression
+            error = np.abs(decoded[:, :, channels] - pixels[:, :, channels]).max()
+            assert error <= block_tolerance, "{} error {} on {}x{} two color blocks".format(
+                compression, error, width, height)
+
+            _, decoded_levels = read_dds(gltf2_io_dds.encode_dds(ramp, compression))
+            assert [level.shape for level in decoded_levels] == [level.shape for level in ramp_levels], \
+                "bad mip levels for {}x{} {}".format(width, height, compression)
+            for level, (expected, actual) in enumerate(zip(ramp_levels, decoded_levels)):
+                error = np.abs(actual[:, :, channels] - expected[:, :, channels]).mean()
+                assert error <= mip_tolerance, "{} error {} in mip {} of a {}x{} ramp".format(
+                    compression, error, level, width, height)
+
+    # Blocks of two colors that only differ orthogonally to the gray axis must not collapse to one color
+    red_green = np.zeros((4, 4, 4), np.uint8)
+    red_green[::2] = (255, 0, 0, 255)
+    red_green[1::2] = (0, 255, 0, 255)
+    _, (decoded, ) = read_dds(gltf2_io_dds.encode_dds(red_green, 'BC1', mipmaps=False))
+    assert np.abs(decoded[:, :, :3] - red_green[:, :, :3]).max() <= 255 / 16 + 255 / 31, "red/green block collapsed"
+except Exception as err:
+    print(err, file=sys.stderr)
+    sys.exit(1)
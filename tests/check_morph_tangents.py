@@ -0,0 +1,84 @@
+# Copyright 2018-2021 The Khronos Group Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Compares the NumPy morph tangents with the per-loop mathutils implementation the exporter used before, on random
+# normals and on parallel, opposite, nearly parallel and zero normals.
+
+import sys
+
+import numpy as np
+from mathutils import Vector
+
+
+def reference_morph_tangents(normals, morph_normal_deltas, tangents):
+    # One loop at a time with mathutils, as computed before
+    morph_tangent_deltas = np.empty((len(normals), 3), dtype=np.float32)
+    for i in range(len(normals)):
+        n = Vector(normals[i])
+        morph_n = n + Vector(morph_normal_deltas[i])  # convert back to non-delta
+        t = Vector(tangents[i, :3])
+
+        rotation = morph_n.rotation_difference(n)
+
+        t_morph = Vector(t)
+        t_morph.rotate(rotation)
+        morph_tangent_deltas[i] = t_morph - t  # back to delta
+    return morph_tangent_deltas
+
+
+def unit(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+try:
+    from io_scene_gltf2_msfs.blender.exp import gltf2_blender_extract
+    calc_morph_tangents = getattr(gltf2_blender_extract, '__calc_morph_tangents')
+
+    rng = np.random.default_rng(0)
+    loops = 2000
+    normals = unit(rng.normal(size=(loops, 3)))
+    tangents = np.concatenate((rng.normal(size=(loops, 3)), np.ones((loops, 1))), axis=1).astype(np.float32)
+    morphed = unit(rng.normal(size=(4, loops, 3)))
+
+    # Opposite normals whose largest components are tied pick the axis of the half turn like Blender does
+    h = np.sqrt(0.5)
+    ties = unit([[h, h, 0], [h, 0, h], [0, h, h], [-h, h, 0], [1, 1, 1], [1, -1, 1], [0, 0, 1], [1, 0, 0]])
+    normals[100:100 + len(ties)] = ties
+
+    morphed[0, :200] = normals[:200]  # parallel
+    morphed[1, :200] = -normals[:200]  # opposite
+    morphed[2, :200] = 2 * normals[:200]  # parallel, not normalized
+    # Nearly parallel: rounding only, then small angles
+    morphed[3, :100] = normals[:100] + np.float32(1e-7)
+    morphed[3, 100:200] = unit(normals[100:200] + rng.normal(scale=1e-3, size=(100, 3)))
+    # Zero morphed normals, and zero base normals
+    morphed[0, 200:250] = 0
+    normals[250:300] = 0
+
+    morph_normal_deltas = (morphed - normals).astype(np.float32)
+    # Spread the loops over several batches
+    gltf2_blender_extract.MORPH_TANGENT_LOOPS_PER_BATCH = 512
+    actual = calc_morph_tangents(normals, morph_normal_deltas, tangents)
+    assert actual.shape == morph_normal_deltas.shape, "bad shape {}".format(actual.shape)
+
+    for shape_key, deltas in enumerate(morph_normal_deltas):
+        expected = reference_morph_tangents(normals, deltas, tangents)
+        error = np.abs(actual[shape_key] - expected).max(axis=1)
+        worst = int(error.argmax())
+        assert error[worst] <= 1e-5, "shape key {} loop {}: error {} for normal {} morphed to {}".format(
+            shape_key, worst, error[worst], normals[worst], morphed[shape_key, worst])
+except Exception as err:
+    print(err, file=sys.stderr)
+    sys.exit(1)
@@ -0,0 +1,112 @@
+# Copyright 2018-2021 The Khronos Group Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Round-trips images through the Blender-free PNG writer and a minimal PNG reader.
+
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+
+def decode_png(data):
+    # Only reads what encode_png writes (non-interlaced 8/16-bit RGB/RGBA), but accepts every filter type
+    assert data[:8] == b'\x89PNG\r\n\x1a\n', "bad signature"
+    offset = 8
+    header = None
+    idat = []
+    while offset < len(data):
+        length, chunk_type = struct.unpack('>I4s', data[offset:offset + 8])
+        chunk = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack('>I', data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(chunk_type + chunk), "bad CRC in " + str(chunk_type)
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif chunk_type == b'IDAT':
+            idat.append(chunk)
+        elif chunk_type == b'IEND':
+            break
+        offset += 12 + length
+
+    width, height, bit_depth, color_type, _, _, interlace = header
+    assert interlace == 0
+    channels = {2: 3, 6: 4}[color_type]
+    bytes_per_pixel = channels * bit_depth // 8
+    stride = width * bytes_per_pixel
+    raw = zlib.decompress(b''.join(idat))
+    assert len(raw) == height * (stride + 1), "bad image data length"
+
+    rows = []
+    previous = bytearray(stride)
+    for y in range(height):
+        filter_type = raw[y * (stride + 1)]
+        row = bytearray(raw[y * (stride + 1) + 1:(y + 1) * (stride + 1)])
+        for x in range(stride):
+            a = row[x - bytes_per_pixel] if x >= bytes_per_pixel else 0
+            b = previous[x]
+            c = previous[x - bytes_per_pixel] if x >= bytes_per_pixel else 0
+            if filter_type == 0:
+                predictor = 0
+            elif filter_type == 1:
+                predictor = a
+            elif filter_type == 2:
+                predictor = b
+            elif filter_type == 3:
+                predictor = (a + b) // 2
+            elif filter_type == 4:
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+            else:
+                raise AssertionError("bad filter type {}".format(filter_type))
+            row[x] = (row[x] + predictor) & 0xff
+        rows.append(bytes(row))
+        previous = row
+
+    dtype = '>u2' if bit_depth == 16 else np.uint8
+    pixels = np.frombuffer(b''.join(rows), dtype).reshape(height, width, channels)
+    return pixels.astype(np.uint16 if bit_depth == 16 else np.uint8)
+
+
+try:
+    from io_scene_gltf2_msfs.io.exp import gltf2_io_png
+
+    rng = np.random.default_rng(0)
+    band = gltf2_io_png.ROWS_PER_BAND
+
+    # Heights around the band size check that the filter continues from the last row of the previous band
+    for height in (1, band - 1, band, band + 1, 2 * band + 3):
+        for channels in (3, 4):
+            for dtype in (np.uint8, np.uint16):
+                width = 5
+                pixels = rng.integers(0, np.iinfo(dtype).max, (height, width, channels), dtype, endpoint=True)
+                # Smooth areas make the Paeth predictor pick each of its neighbours
+                pixels[:height // 2, :, 0] = np.arange(width, dtype=dtype)
+                pixels[:, :2, -1] = np.arange(height, dtype=dtype)[:, np.newaxis]
+                for compression in (0, 9):
+                    decoded = decode_png(gltf2_io_png.encode_png(pixels, compression))
+                    assert decoded.dtype == dtype, "bad bit depth"
+                    assert np.array_equal(decoded, pixels), \
+                        "PNG round-trip mismatch for {}x{}x{} {}".format(width, height, channels, np.dtype(dtype).name)
+
+    try:
+        gltf2_io_png.encode_png(np.zeros((1, 1, 3), np.float32))
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("float pixels must be rejected")
+except Exception as err:
+    print(err, file=sys.stderr)
+    sys.exit(1)
@@ -0,0 +1,195 @@
+# Copyright 2018-2021 The Khronos Group Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Exports the skinned meshes of the open scene, with and without the Asobo optimization, and compares the JOINTS_0
+# and WEIGHTS_0 values bit for bit with the per-vertex implementation the exporter used before skin weights were
+# extracted with NumPy. Copies of the mesh add the edge cases: equal weights, groups that aren't bones, verts without
+# weights and single influence (BLEND1) primitives.
+
+import json
+import os
+import sys
+import tempfile
+import urllib.parse
+
+import bpy
+import numpy as np
+
+COMPONENT_TYPES = {5120: 'i1', 5121: 'u1', 5122: '<i2', 5123: '<u2', 5125: '<u4', 5126: '<f4'}
+COMPONENT_COUNTS = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4}
+
+
+def read_accessor(gltf_path, asset, accessor_index):
+    accessor = asset['accessors'][accessor_index]
+    buffer_view = asset['bufferViews'][accessor['bufferView']]
+    buffer = asset['buffers'][buffer_view['buffer']]
+    with open(os.path.join(os.path.dirname(gltf_path), urllib.parse.unquote(buffer['uri'])), 'rb') as file:
+        data = file.read()
+    dtype = np.dtype(COMPONENT_TYPES[accessor['componentType']])
+    components = COMPONENT_COUNTS[accessor['type']]
+    stride = buffer_view.get('byteStride', dtype.itemsize * components)
+    offset = buffer_view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    return np.ndarray((accessor['count'], components), dtype, data, offset, (stride, dtype.itemsize))
+
+
+def reference_bones(blender_object, joint_names):
+    # The (joint, weight) pairs of each vert, as gathered per vertex before
+    group_to_joint = [joint_names.get(g.name) for g in blender_object.vertex_groups]
+    vert_bones = []
+    for vertex in blender_object.data.vertices:
+        bones = []
+        for group_element in vertex.groups:
+            weight = group_element.weight
+            if weight <= 0.0:
+                continue
+            try:
+                joint = group_to_joint[group_element.group]
+            except Exception:
+                continue
+            if joint is None:
+                continue
+            bones.append((joint, weight))
+        bones.sort(key=lambda x: x[1], reverse=True)
+        if not bones:
+            bones = ((0, 1.0),)
+        vert_bones.append(list(bones) + [(0, 0.0)] * (4 - len(bones)))
+    return vert_bones
+
+
+def reference_vertex_type(blender_object, vertex_indices):
+    vertex_type = 'VTX'
+    for vi in vertex_indices:
+        weight_count = len([g for g in blender_object.data.vertices[vi].groups if g.weight > 0])
+        if weight_count > 1:
+            return 'BLEND4'
+        elif weight_count == 1:
+            vertex_type = 'BLEND1'
+    return vertex_type
+
+
+def reference_rows(vert_bones, vertex_indices, vertex_type):
+    rows = set()
+    for vi in vertex_indices:
+        joints = tuple(joint for joint, _ in vert_bones[vi][:4])
+        weights = [weight for _, weight in vert_bones[vi][:4]]
+        if vertex_type == 'BLEND1':
+            # One unnormalized weight per vert
+            rows.add((joints, tuple(np.array(weights[:1], np.float32).tolist())))
+            continue
+        total = sum(weights)
+        if total > 0:
+            factor = 1.0 / total
+            weights = [w * factor for w in weights]
+        if vertex_type == 'BLEND4':
+            rows.add((joints, tuple(round(w * 65535) for w in weights)))
+        else:
+            rows.add((joints, tuple(np.array(weights, np.float32).tolist())))
+    return rows
+
+
+def primitive_vertices(blender_object, asset, primitive):
+    material = asset['materials'][primitive['material']]['name'] if 'material' in primitive else None
+    slots = [slot.material.name if slot.material else None for slot in blender_object.material_slots] or [None]
+    return {vi for polygon in blender_object.data.polygons
+            if slots[min(polygon.material_index, len(slots) - 1)] == material for vi in polygon.vertices}
+
+
+def check_export(gltf_path, asobo):
+    with open(gltf_path) as file:
+        asset = json.load(file)
+    checked = set()
+    for node in asset['nodes']:
+        if 'mesh' not in node or 'skin' not in node:
+            continue
+        blender_object = bpy.data.objects[node['name']]
+        skin = asset['skins'][node['skin']]
+        joint_names = {asset['nodes'][joint]['name']: i for i, joint in enumerate(skin['joints'])}
+        vert_bones = reference_bones(blender_object, joint_names)
+
+        for primitive in asset['meshes'][node['mesh']]['primitives']:
+            vertex_indices = primitive_vertices(blender_object, asset, primitive)
+            vertex_type = None
+            if asobo:
+                vertex_type = reference_vertex_type(blender_object, vertex_indices)
+                exported_type = primitive['extras']['ASOBO_primitive']['VertexType']
+                assert exported_type == vertex_type, "{}: vertex type {} instead of {}".format(
+                    node['name'], exported_type, vertex_type)
+
+            joints = read_accessor(gltf_path, asset, primitive['attributes']['JOINTS_0'])
+            weights = read_accessor(gltf_path, asset, primitive['attributes']['WEIGHTS_0'])
+            exported = {(tuple(js.tolist()), tuple(ws.tolist())) for js, ws in zip(joints, weights)}
+            expected = reference_rows(vert_bones, vertex_indices, vertex_type)
+            assert exported == expected, "{}: {} joints/weights differ from the per-vertex export".format(
+                node['name'], 'Asobo' if asobo else 'glTF')
+
+            if not asobo and max(max(js) for js, _ in expected) < 256:
+                assert asset['accessors'][primitive['attributes']['JOINTS_0']]['componentType'] == 5121
+        checked.add(blender_object.name)
+    return checked
+
+
+def copy_object(source, name):
+    blender_object = source.copy()
+    blender_object.data = source.data.copy()
+    blender_object.name = name
+    bpy.context.scene.collection.objects.link(blender_object)
+    return blender_object
+
+
+def remove_groups(blender_object, vertex):
+    for group in [group_element.group for group_element in vertex.groups]:
+        blender_object.vertex_groups[group].remove([vertex.index])
+
+
+try:
+    source = next(o for o in bpy.context.scene.objects if o.type == 'MESH' and o.find_armature() is not None)
+    bone_names = set(source.find_armature().data.bones.keys())
+    joint_groups = [g for g in source.vertex_groups if g.name in bone_names]
+
+    # Equal weights must keep the order of the groups, groups that aren't bones are not joints but still count as
+    # influences for the Asobo vertex type, verts without weights get joint 0 with weight 1
+    ties = copy_object(source, 'SkinTies')
+    not_a_bone = ties.vertex_groups.new(name='NotABone')
+    for vertex in ties.data.vertices:
+        remove_groups(ties, vertex)
+        if vertex.index % 7 == 0:
+            continue
+        for i, group in enumerate(joint_groups):
+            ties.vertex_groups[group.name].add([vertex.index], 0.25 if (vertex.index + i) % 3 else 0.5, 'REPLACE')
+        if vertex.index % 3 == 0:
+            not_a_bone.add([vertex.index], 0.9, 'REPLACE')
+
+    # One influence per vert makes BLEND1 primitives, whose weights are not normalized
+    single = copy_object(source, 'SkinSingle')
+    for vertex in single.data.vertices:
+        remove_groups(single, vertex)
+        if vertex.index % 5 == 0:
+            continue
+        group = joint_groups[vertex.index % len(joint_groups)]
+        single.vertex_groups[group.name].add([vertex.index], 0.75 if vertex.index % 2 else 0.5, 'REPLACE')
+
+    output_dir = tempfile.mkdtemp()
+    for asobo in (False, True):
+        gltf_path = os.path.join(output_dir, 'asobo' if asobo else 'gltf', 'skin.gltf')
+        os.makedirs(os.path.dirname(gltf_path))
+        bpy.ops.export_scene.gltf_msfs(
+            export_format='GLTF_SEPARATE',
+            filepath=gltf_path,
+            emulate_asobo_optimization=asobo,
+        )
+        checked = check_export(gltf_path, asobo)
+        assert {source.name, ties.name, single.name} <= checked, "skinned meshes missing from the export"
+except Exception as err:
+    print(err, file=sys.stderr)
+    sys.exit(1)
@@ -0,0 +1,84 @@
+# Copyright 2018-2021 The Khronos Group Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Exports two quads whose shared edge is split into two nearly coincident edges, with and without weld tolerances.
+# The tolerances must merge the split edge, except on a copy with a shape key, whose verts can't be merged.
+# Usage: blender -b --addons io_scene_gltf2_msfs --python check_vertex_weld.py -- <output dir>
+# The output dir gets weld.gltf, for the validator.
+
+import json
+import os
+import sys
+
+import bpy
+
+TOLERANCES = {
+    'export_weld_position_tolerance': 1e-3,
+    'export_weld_normal_tolerance': 1e-3,
+    'export_weld_uv_tolerance': 1e-3,
+}
+GAP = 1e-5
+
+
+def make_quads(name):
+    # Two unit quads in the XY plane, the second one starting GAP after the first one
+    vertices = [(x, y, 0) for x in (0, 1, 1 + GAP, 2 + GAP) for y in (0, 1)]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(vertices, [], [(0, 2, 3, 1), (4, 6, 7, 5)])
+    uv_layer = mesh.uv_layers.new()
+    for loop in mesh.loops:
+        x, y, _ = vertices[loop.vertex_index]
+        uv_layer.data[loop.index].uv = (x / 2, y)
+    mesh.update()
+    blender_object = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(blender_object)
+    return blender_object
+
+
+def position_counts(gltf_path):
+    with open(gltf_path) as file:
+        asset = json.load(file)
+    return {node['name']: sum(asset['accessors'][primitive['attributes']['POSITION']]['count']
+                              for primitive in asset['meshes'][node['mesh']]['primitives'])
+            for node in asset['nodes'] if 'mesh' in node}
+
+
+try:
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    output_dir = argv[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    for blender_object in list(bpy.data.objects):
+        bpy.data.objects.remove(blender_object)
+    make_quads('Quads')
+    morphed = make_quads('MorphedQuads')
+    morphed.shape_key_add(name='Basis')
+    morphed.shape_key_add(name='Up').data[0].co.z = 1
+
+    counts = {}
+    for name, tolerances in (('exact', {}), ('weld', TOLERANCES)):
+        gltf_path = os.path.join(output_dir, name + '.gltf')
+        bpy.ops.export_scene.gltf_msfs(
+            export_format='GLTF_SEPARATE',
+            filepath=gltf_path,
+            emulate_asobo_optimization=False,
+            **tolerances
+        )
+        counts[name] = position_counts(gltf_path)
+
+    assert counts['exact'] == {'Quads': 8, 'MorphedQuads': 8}, "unexpected exact counts {}".format(counts['exact'])
+    assert counts['weld'] == {'Quads': 6, 'MorphedQuads': 8}, "unexpected welded counts {}".format(counts['weld'])
+except Exception as err:
+    print(err, file=sys.stderr)
+    sys.exit(1)
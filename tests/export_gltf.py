@@ -40,6 +40,12 @@ try:
         'filepath': os.path.join(output_dir, path_parts[1]),
         'emulate_asobo_optimization': False,
     }
+    if '--dds' in argv:
+        args['export_image_format'] = 'DDS'
+    if '--weld' in argv:
+        args['export_weld_position_tolerance'] = 1e-4
+        args['export_weld_normal_tolerance'] = 1e-3
+        args['export_weld_uv_tolerance'] = 1e-4
     bpy.ops.export_scene.gltf_msfs(**args)
 except Exception as err:
     print(err, file=sys.stderr)
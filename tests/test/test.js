@@ -64,6 +64,18 @@ function blenderRoundtripGltf(blenderVersion, gltfPath, outDirName, done, option
     });
 }
 
+function blenderPythonCheck(blenderVersion, scriptPath, done, blenderPath='', options='') {
+    const { exec } = require('child_process');
+    const cmd = `${blenderVersion} -b --addons io_scene_gltf2_msfs -noaudio ${blenderPath} --python ${scriptPath} -- ${options}`;
+    var prc = exec(cmd, (error, stdout, stderr) => {
+        if (error) {
+            done(new Error(stderr || error.message));
+            return;
+        }
+        done();
+    });
+}
+
 function validateGltf(gltfPath, done) {
     const asset = fs.readFileSync(gltfPath);
     validator.validateBytes(new Uint8Array(asset), {
@@ -215,13 +227,29 @@ describe('General', function() {
     });
 });
 
+describe('Encoders', function() {
+    blenderVersions.forEach(function(blenderVersion) {
+        describe(blenderVersion + '_encoders', function() {
+            it('round-trips 8/16-bit RGB/RGBA images through the PNG writer', function(done) {
+                blenderPythonCheck(blenderVersion, 'check_png_encoder.py', done);
+            });
+
+            it('decodes BC1/BC3/BC5 blocks and mip levels of the DDS writer', function(done) {
+                blenderPythonCheck(blenderVersion, 'check_dds_encoder.py', done);
+            });
+        });
+    });
+});
+
 describe('Exporter', function() {
     let blenderSampleScenes = fs.readdirSync('scenes').filter(f => f.endsWith('.blend')).map(f => f.substring(0, f.length - 6));
 
     blenderVersions.forEach(function(blenderVersion) {
         let variants = [
             ['', ''],
-            ['_glb', '--glb']
+            ['_glb', '--glb'],
+            ['_dds', '--dds'],
+            ['_weld', '--weld']
         ];
 
         variants.forEach(function(variant) {
@@ -737,6 +765,73 @@ describe('Exporter', function() {
                 assert.strictEqual(point_prims.length, 1);
             })
         });
+
+        describe(blenderVersion + '_export_dds_results', function() {
+            let outDirName = 'out' + blenderVersion + '_dds';
+            let outDirPath = path.resolve(OUT_PREFIX, 'scenes', outDirName);
+
+            it('references DDS images through MSFT_texture_dds', function() {
+                let gltfPath = path.resolve(outDirPath, '01_principled_material.gltf');
+                const asset = JSON.parse(fs.readFileSync(gltfPath));
+
+                assert(asset.extensionsUsed.includes('MSFT_texture_dds'));
+                // There is no fallback image in the texture source, so viewers must support the extension
+                assert(asset.extensionsRequired.includes('MSFT_texture_dds'));
+
+                assert.strictEqual(asset.materials.length, 1);
+                const baseColorTexture = asset.textures[asset.materials[0].pbrMetallicRoughness.baseColorTexture.index];
+                assert.strictEqual(baseColorTexture.source, undefined);
+                const baseColorImage = asset.images[baseColorTexture.extensions.MSFT_texture_dds.source];
+                assert.strictEqual(baseColorImage.mimeType, 'image/vnd-ms.dds');
+                assert.strictEqual(baseColorImage.uri, '01_principled_baseColor.dds');
+
+                const data = fs.readFileSync(path.resolve(outDirPath, baseColorImage.uri));
+                assert.strictEqual(data.toString('ascii', 0, 4), 'DDS ');
+            });
+
+            it('exports normal maps as BC5', function() {
+                let gltfPath = path.resolve(outDirPath, '01_principled_material.gltf');
+                const asset = JSON.parse(fs.readFileSync(gltfPath));
+
+                const normalTexture = asset.textures[asset.materials[0].normalTexture.index];
+                const normalImage = asset.images[normalTexture.extensions.MSFT_texture_dds.source];
+                assert.strictEqual(normalImage.mimeType, 'image/vnd-ms.dds');
+
+                // The FourCC of the pixel format, ATI2 is BC5
+                const data = fs.readFileSync(path.resolve(outDirPath, normalImage.uri));
+                assert.strictEqual(data.toString('ascii', 84, 88), 'ATI2');
+            });
+        });
+
+        describe(blenderVersion + '_export_skin_weights', function() {
+            it('exports the joints and weights of the per-vertex implementation, with and without Asobo optimization', function(done) {
+                blenderPythonCheck(blenderVersion, 'check_skin_weights.py', done, 'scenes/03_skinned_cylinder.blend');
+            });
+        });
+
+        describe(blenderVersion + '_export_asobo_bounding_box', function() {
+            it('exports the world space bounds of every instance as the Asobo bounding box', function(done) {
+                blenderPythonCheck(blenderVersion, 'check_asobo_bounding_box.py', done);
+            });
+        });
+
+        describe(blenderVersion + '_export_morph_tangents', function() {
+            it('computes the morph tangents of the per-loop mathutils implementation', function(done) {
+                blenderPythonCheck(blenderVersion, 'check_morph_tangents.py', done);
+            });
+        });
+
+        describe(blenderVersion + '_export_weld_results', function() {
+            it('welds vertices that are closer than the weld tolerances', function(done) {
+                let outDirPath = path.resolve(OUT_PREFIX, 'scenes', 'out' + blenderVersion + '_weld_check');
+                blenderPythonCheck(blenderVersion, 'check_vertex_weld.py', (error) => {
+                    if (error)
+                        return done(error);
+
+                    validateGltf(path.resolve(outDirPath, 'weld.gltf'), done);
+                }, '', outDirPath);
+            });
+        });
     });
 });
 
@@ -0,0 +1,46 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This script measures the throughput of the DDS encoder, in seconds per megapixel including the mip chain
+# Example:
+# blender -b --python tools/benchmark_dds.py -- -s 2048
+
+import argparse
+import sys
+import time
+from os.path import dirname, realpath
+
+import numpy as np
+
+sys.path.insert(0, dirname(realpath(__file__)) + "/../addons/")
+from io_scene_gltf2_msfs.io.exp import gltf2_io_dds
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+ap = argparse.ArgumentParser()
+ap.add_argument("-s", "--size", type=int, default=2048, help="width and height of the test image")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="runs per format, the fastest is reported")
+args = vars(ap.parse_args(argv))
+
+size = args["size"]
+# Noise is the worst case for the endpoint search, a smooth image would compress faster
+pixels = np.random.default_rng(0).integers(0, 256, (size, size, 4), np.uint8)
+megapixels = size * size / 1e6
+
+for compression in (gltf2_io_dds.BC1, gltf2_io_dds.BC3, gltf2_io_dds.BC5):
+    times = []
+    for _ in range(args["repeat"]):
+        start = time.perf_counter()
+        gltf2_io_dds.encode_dds(pixels, compression)
+        times.append(time.perf_counter() - start)
+    print("{}: {:.2f} s/MP ({}x{}, {:.2f} s)".format(compression, min(times) / megapixels, size, size, min(times)))
@@ -0,0 +1,68 @@
+# Copyright 2018-2021 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This script compares the hashed vertex weld with np.unique on the structured corner records it replaced
+# Example:
+# blender -b --python tools/benchmark_vertex_weld.py -- -c 1000000
+
+import argparse
+import sys
+import time
+from os.path import dirname, realpath
+
+import numpy as np
+
+sys.path.insert(0, dirname(realpath(__file__)) + "/../addons/")
+from io_scene_gltf2_msfs.io.exp import gltf2_io_vertex_weld
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+ap = argparse.ArgumentParser()
+ap.add_argument("-c", "--corners", type=int, default=1000000, help="number of corners")
+ap.add_argument("-f", "--fields", type=int, default=16, help="float fields per corner, besides the vertex index")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="runs per method, the fastest is reported")
+args = vars(ap.parse_args(argv))
+
+# Like a mesh, corners share a vert and most share all their other attributes with another corner of that vert
+rng = np.random.default_rng(0)
+corners = args["corners"]
+vertex_count = corners // 4
+vertex_index = rng.integers(0, vertex_count, corners)
+variant = rng.integers(0, 2, corners)
+attributes = rng.random((vertex_count, 2, args["fields"]), np.float32)[vertex_index, variant]
+
+dots = np.empty(corners, dtype=[('vertex_index', np.uint32)] + [('f%d' % i, np.float32) for i in range(args["fields"])])
+dots['vertex_index'] = vertex_index
+for i in range(args["fields"]):
+    dots['f%d' % i] = attributes[:, i]
+
+
+def unique_records():
+    _, inverse = np.unique(dots, return_inverse=True)
+    return inverse.max() + 1
+
+
+def hashed_weld():
+    columns = [dots['vertex_index'].astype(np.int64)[:, None]]
+    columns += [gltf2_io_vertex_weld.key_columns(dots[name])[:, None] for name in dots.dtype.names[1:]]
+    first, _ = gltf2_io_vertex_weld.weld(np.concatenate(columns, axis=1))
+    return len(first)
+
+
+for name, method in (("np.unique", unique_records), ("hashed weld", hashed_weld)):
+    times = []
+    for _ in range(args["repeat"]):
+        start = time.perf_counter()
+        unique = method()
+        times.append(time.perf_counter() - start)
+    print("{}: {:.2f} s, {} unique of {} corners".format(name, min(times), unique, corners))